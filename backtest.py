@@ -1,16 +1,17 @@
 import json
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 from strategy.strategy import Strategy
-from strategy.strategy_backtester import StrategyBacktester
+from strategy.strategy_backtester import StrategyBacktester, load_bars
+from lib.levels import get_static_levels
 
 # Load historical data
-csv_file = "data/es-1m-cleaned.csv"
-data = pd.read_csv(csv_file, parse_dates=[0], index_col=0)
+data = load_bars("data/es-1m-cleaned.csv")
 
 # Initialize backtester
 bt = StrategyBacktester()
@@ -19,23 +20,32 @@ bt = StrategyBacktester()
 with open("strategy/backtest_config.json", "r") as f:
     strategy_config = json.load(f)
 
-    STATIC_LEVELS = strategy_config.get("static_levels", [])
+    # Shared level set unless the config overrides it
+    STATIC_LEVELS = strategy_config.get("static_levels")
+    if STATIC_LEVELS is None:
+        STATIC_LEVELS = get_static_levels()
     # Build long_dates
     long_date_ranges = strategy_config.get("long_date_ranges", [])
-    long_dates = pd.DatetimeIndex([])
+    long_parts = []
 
     for start_str, end_str in long_date_ranges:
         start = pd.to_datetime(start_str)
         end = pd.to_datetime(end_str)
-        long_dates = long_dates.union(pd.date_range(start=start, end=end, freq="1min"))
+        long_parts.append(pd.date_range(start=start, end=end, freq="1min").values)
+
+    # Concatenate once instead of re-sorting a growing index with union() per range
+    long_dates = pd.DatetimeIndex(np.unique(np.concatenate(long_parts))) if long_parts else pd.DatetimeIndex([])
 
     short_date_ranges = strategy_config.get("short_date_ranges", [])
-    short_dates = pd.DatetimeIndex([])
+    short_parts = []
 
     for start_str, end_str in short_date_ranges:
         start = pd.to_datetime(start_str)
         end = pd.to_datetime(end_str)
-        short_dates = short_dates.union(pd.date_range(start=start, end=end, freq="1min"))
+        short_parts.append(pd.date_range(start=start, end=end, freq="1min").values)
+
+    # Concatenate once instead of re-sorting a growing index with union() per range
+    short_dates = pd.DatetimeIndex(np.unique(np.concatenate(short_parts))) if short_parts else pd.DatetimeIndex([])
 
     # Optional: Define early close calendar for holidays
     # Example: {"2024-11-29": (12, 15), "2024-12-24": (12, 15)}
@@ -69,8 +79,6 @@ with open("strategy/backtest_config.json", "r") as f:
     bt.strategies[0].print_trade_stats()
 
     # Export results to CSV
-    s = bt.strategies[0]
-    trades_df = pd.DataFrame(s.trade_history, columns=['timestamp', 'action', 'price', 'pnl'])
-    trades_df['cumulative_pnl'] = trades_df['pnl'].cumsum()
+    trades_df = bt.strategies[0].get_trade_history_frame()
     trades_df.to_csv('backtest_results.csv', index=False)
     print(f"\nResults saved to backtest_results.csv ({len(trades_df)} trades)")
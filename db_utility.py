@@ -103,8 +103,8 @@ def reset_all(db_path: str, confirm: bool = False):
     persistence = StatePersistence(db_path)
     strategies = persistence.list_strategies()
     
+    persistence.delete_many(strategies)
     for strategy_name in strategies:
-        persistence.delete_strategy_state(strategy_name)
         print(f"Deleted: {strategy_name}")
     
     print(f"\nSuccessfully reset database. Deleted {len(strategies)} strategies.")
@@ -17,10 +17,13 @@ Important Notes:
 - Early closes on certain holidays are handled via an optional calendar
 """
 
-from datetime import datetime, time, timedelta
-from typing import Optional, Tuple
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
 import logging
 
+import numpy as np
+
 try:
     import pytz
     HAS_PYTZ = True
@@ -35,6 +38,13 @@ except ImportError:
 
 logger = logging.getLogger('strategy')
 
+# Trading status codes stored in the minute-of-week lookup tables
+STATUS_OPEN = 0
+STATUS_FLATTEN = 1
+STATUS_CLOSED = 2
+
+MINUTES_PER_DAY = 24 * 60
+
 
 class CMETradingHours:
     """
@@ -60,12 +70,38 @@ class CMETradingHours:
         Initialize CME trading hours handler.
 
         Args:
-            early_close_calendar: Optional dict mapping date strings (YYYY-MM-DD)
-                                  to early close times as (hour, minute) tuples.
+            early_close_calendar: Optional dict mapping date strings (YYYY-MM-DD) or date
+                                  objects to early close times as (hour, minute) tuples.
                                   Example: {"2024-11-29": (12, 15), "2024-12-24": (12, 15)}
         """
-        self.early_close_calendar = early_close_calendar or {}
+        # Key the calendar by date objects so lookups don't need strftime per call
+        self.early_close_calendar = {
+            key if isinstance(key, date) else datetime.strptime(key, "%Y-%m-%d").date(): close
+            for key, close in (early_close_calendar or {}).items()
+        }
         self._chicago_tz = self._get_chicago_timezone()
+        # Resolve the timezone backend once instead of branching on it per call
+        if self._chicago_tz is None:
+            # Fallback: assume input is already in CT or close enough
+            self._localize = self._convert = lambda dt: dt
+        else:
+            if HAS_ZONEINFO:
+                self._localize = lambda dt: dt.replace(tzinfo=self._chicago_tz)
+            else:
+                self._localize = self._chicago_tz.localize
+            self._convert = lambda dt: dt.astimezone(self._chicago_tz)
+
+        # The rules only depend on weekday and minute of day, so precompute the
+        # status of every minute of a standard week once. Early close dates get
+        # their own single-day table, built lazily the first time they are seen.
+        self._status_lut = np.concatenate([
+            self._build_day_lut(weekday, self.DAILY_CLOSE_TIME) for weekday in range(7)
+        ])
+        self._early_close_luts = {}
+
+        # Close/flatten times only change per calendar date, so memoize them
+        self._close_cache: Dict[date, time] = {}
+        self._flatten_cache: Dict[date, time] = {}
 
     def _get_chicago_timezone(self):
         """Get Chicago timezone object, handling different Python versions."""
@@ -87,24 +123,8 @@ class CMETradingHours:
         Returns:
             Datetime in Chicago time
         """
-        if self._chicago_tz is None:
-            # Fallback: assume input is already in CT or close enough
-            return dt
-
-        if dt.tzinfo is None:
-            # Naive datetime - assume it's already in Chicago time for backtesting
-            if HAS_ZONEINFO:
-                return dt.replace(tzinfo=self._chicago_tz)
-            elif HAS_PYTZ:
-                return self._chicago_tz.localize(dt)
-        else:
-            # Convert to Chicago time
-            if HAS_ZONEINFO:
-                return dt.astimezone(self._chicago_tz)
-            elif HAS_PYTZ:
-                return dt.astimezone(self._chicago_tz)
-
-        return dt
+        # Naive datetimes are assumed to already be in Chicago time (backtesting)
+        return self._convert(dt) if dt.tzinfo is not None else self._localize(dt)
 
     def _get_close_time_for_date(self, dt: datetime) -> time:
         """
@@ -116,14 +136,19 @@ class CMETradingHours:
         Returns:
             Close time for that date
         """
-        date_str = dt.strftime("%Y-%m-%d")
+        day = dt.date()
+        close_time = self._close_cache.get(day)
+        if close_time is None:
+            # Check early close calendar
+            if day in self.early_close_calendar:
+                hour, minute = self.early_close_calendar[day]
+                close_time = time(hour, minute)
+            else:
+                close_time = self.DAILY_CLOSE_TIME
 
-        # Check early close calendar
-        if date_str in self.early_close_calendar:
-            hour, minute = self.early_close_calendar[date_str]
-            return time(hour, minute)
+            self._close_cache[day] = close_time
 
-        return self.DAILY_CLOSE_TIME
+        return close_time
 
     def _get_flatten_time_for_date(self, dt: datetime) -> time:
         """
@@ -135,73 +160,112 @@ class CMETradingHours:
         Returns:
             Flatten time for that date
         """
-        close_time = self._get_close_time_for_date(dt)
-        # Create a datetime to do the subtraction
-        close_dt = datetime.combine(dt.date(), close_time)
-        flatten_dt = close_dt - timedelta(minutes=self.FLATTEN_MINUTES_BEFORE_CLOSE)
-        return flatten_dt.time()
-
-    def is_market_closed(self, dt: datetime) -> bool:
+        day = dt.date()
+        flatten_time = self._flatten_cache.get(day)
+        if flatten_time is None:
+            close_time = self._get_close_time_for_date(dt)
+            # Create a datetime to do the subtraction
+            close_dt = datetime.combine(day, close_time)
+            flatten_dt = close_dt - timedelta(minutes=self.FLATTEN_MINUTES_BEFORE_CLOSE)
+            flatten_time = flatten_dt.time()
+            self._flatten_cache[day] = flatten_time
+
+        return flatten_time
+
+    def _build_day_lut(self, weekday: int, close_time: time) -> np.ndarray:
         """
-        Check if the market is closed at the given time.
-
-        Market is closed between close time (4:00 PM CT) and reopen time (5:00 PM CT).
-        On weekends (Saturday all day, Sunday until 5:00 PM CT).
+        Build the per-minute trading status for one day.
 
         Args:
-            dt: Datetime to check
+            weekday: Day of week (Monday=0, Sunday=6)
+            close_time: Market close time for that day
 
         Returns:
-            True if market is closed, False if open
+            uint8 array of length 1440 holding STATUS_* codes
         """
-        chicago_dt = self._to_chicago_time(dt)
-        current_time = chicago_dt.time()
-        weekday = chicago_dt.weekday()  # Monday=0, Sunday=6
+        minutes = np.arange(MINUTES_PER_DAY)
+        close_minute = close_time.hour * 60 + close_time.minute
+        flatten_minute = (close_minute - self.FLATTEN_MINUTES_BEFORE_CLOSE) % MINUTES_PER_DAY
+        reopen_minute = self.DAILY_REOPEN_TIME.hour * 60 + self.DAILY_REOPEN_TIME.minute
 
-        close_time = self._get_close_time_for_date(chicago_dt)
+        day_lut = np.full(MINUTES_PER_DAY, STATUS_OPEN, dtype=np.uint8)
 
         # Saturday is always closed
         if weekday == 5:
-            return True
+            day_lut[:] = STATUS_CLOSED
+            return day_lut
+
+        day_lut[(flatten_minute <= minutes) & (minutes < close_minute)] = STATUS_FLATTEN
+        day_lut[(close_minute <= minutes) & (minutes < reopen_minute)] = STATUS_CLOSED
 
         # Sunday is closed until 5:00 PM CT
         if weekday == 6:
-            return current_time < self.DAILY_REOPEN_TIME
+            day_lut[:reopen_minute] = STATUS_CLOSED
+
+        return day_lut
 
-        # Monday-Friday: closed between close_time and reopen_time
-        if close_time <= current_time < self.DAILY_REOPEN_TIME:
-            return True
+    def _get_status(self, chicago_dt: datetime) -> int:
+        """
+        Look up the trading status for a datetime already in Chicago time.
 
-        return False
+        Args:
+            chicago_dt: Datetime in Chicago time
 
-    def should_flatten_positions(self, dt: datetime) -> bool:
+        Returns:
+            One of STATUS_OPEN, STATUS_FLATTEN or STATUS_CLOSED
         """
-        Check if we should flatten positions (20 minutes before market close).
+        minute_of_day = chicago_dt.hour * 60 + chicago_dt.minute
+
+        if self.early_close_calendar:
+            day = chicago_dt.date()
+            if day in self.early_close_calendar:
+                day_lut = self._early_close_luts.get(day)
+                if day_lut is None:
+                    day_lut = self._build_day_lut(chicago_dt.weekday(),
+                                                  self._get_close_time_for_date(chicago_dt))
+                    self._early_close_luts[day] = day_lut
+                return int(day_lut[minute_of_day])
+
+        return int(self._status_lut[chicago_dt.weekday() * MINUTES_PER_DAY + minute_of_day])
+
+    def classify(self, dt: datetime) -> int:
+        """
+        Get the trading status for a datetime with a single timezone conversion and table lookup.
 
         Args:
-            dt: Datetime to check
+            dt: Datetime to check (naive datetimes are treated as Chicago time)
 
         Returns:
-            True if we should flatten positions, False otherwise
+            One of STATUS_OPEN, STATUS_FLATTEN or STATUS_CLOSED
         """
-        chicago_dt = self._to_chicago_time(dt)
-        current_time = chicago_dt.time()
-        weekday = chicago_dt.weekday()
+        return self._get_status(self._to_chicago_time(dt))
 
-        # Don't need to flatten on Saturday or Sunday before open
-        if weekday == 5:
-            return False
-        if weekday == 6 and current_time < self.DAILY_REOPEN_TIME:
-            return False
+    def is_market_closed(self, dt: datetime) -> bool:
+        """
+        Check if the market is closed at the given time.
 
-        flatten_time = self._get_flatten_time_for_date(chicago_dt)
-        close_time = self._get_close_time_for_date(chicago_dt)
+        Market is closed between close time (4:00 PM CT) and reopen time (5:00 PM CT).
+        On weekends (Saturday all day, Sunday until 5:00 PM CT).
+
+        Args:
+            dt: Datetime to check
+
+        Returns:
+            True if market is closed, False if open
+        """
+        return self.classify(dt) == STATUS_CLOSED
+
+    def should_flatten_positions(self, dt: datetime) -> bool:
+        """
+        Check if we should flatten positions (20 minutes before market close).
 
-        # Flatten if we're in the flatten window (between flatten time and close time)
-        if flatten_time <= current_time < close_time:
-            return True
+        Args:
+            dt: Datetime to check
 
-        return False
+        Returns:
+            True if we should flatten positions, False otherwise
+        """
+        return self.classify(dt) == STATUS_FLATTEN
 
     def is_trading_allowed(self, dt: datetime) -> bool:
         """
@@ -217,13 +281,53 @@ class CMETradingHours:
         Returns:
             True if trading is allowed, False otherwise
         """
-        if self.is_market_closed(dt):
-            return False
+        return self.classify(dt) == STATUS_OPEN
 
-        if self.should_flatten_positions(dt):
-            return False
+    def classify_index(self, index) -> np.ndarray:
+        """
+        Get the trading status for a whole pandas DatetimeIndex at once.
+
+        Naive timestamps are treated as Chicago time, like the scalar methods.
 
-        return True
+        Args:
+            index: pandas DatetimeIndex to classify
+
+        Returns:
+            uint8 array of STATUS_OPEN / STATUS_FLATTEN / STATUS_CLOSED codes
+        """
+        if index.tz is not None:
+            if self._chicago_tz is not None:
+                index = index.tz_convert(self._chicago_tz)
+            index = index.tz_localize(None)
+
+        weekdays = index.weekday.to_numpy()
+        minutes = index.hour.to_numpy() * 60 + index.minute.to_numpy()
+        status = self._status_lut[weekdays * MINUTES_PER_DAY + minutes]
+
+        if self.early_close_calendar:
+            days = index.normalize().to_numpy()
+            early_days = np.array(list(self.early_close_calendar), dtype="datetime64[ns]")
+            is_early = np.isin(days, early_days)
+            if is_early.any():
+                for day, (hour, minute) in self.early_close_calendar.items():
+                    on_day = is_early & (days == np.datetime64(day, "ns"))
+                    if on_day.any():
+                        day_lut = self._build_day_lut(day.weekday(), time(hour, minute))
+                        status[on_day] = day_lut[minutes[on_day]]
+
+        return status
+
+    def is_trading_allowed_bulk(self, index) -> np.ndarray:
+        """
+        Vectorized is_trading_allowed() for a whole pandas DatetimeIndex.
+
+        Args:
+            index: pandas DatetimeIndex to check
+
+        Returns:
+            Boolean array, True where trading is allowed
+        """
+        return self.classify_index(index) == STATUS_OPEN
 
     def get_trading_status(self, dt: datetime) -> Tuple[bool, str]:
         """
@@ -236,29 +340,52 @@ class CMETradingHours:
             Tuple of (is_trading_allowed, status_message)
         """
         chicago_dt = self._to_chicago_time(dt)
+        status = self._get_status(chicago_dt)
         current_time = chicago_dt.time()
         weekday = chicago_dt.weekday()
         day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
+        if status == STATUS_OPEN:
+            return True, f"Trading allowed ({day_names[weekday]} {current_time} CT)"
+
+        close_time = self._get_close_time_for_date(chicago_dt)
+
+        if status == STATUS_FLATTEN:
+            flatten_time = self._get_flatten_time_for_date(chicago_dt)
+            return False, f"Flatten window ({flatten_time} - {close_time} CT)"
+
         if weekday == 5:
             return False, f"Market closed (Saturday)"
 
         if weekday == 6 and current_time < self.DAILY_REOPEN_TIME:
             return False, f"Market closed (Sunday, opens at {self.DAILY_REOPEN_TIME})"
 
-        close_time = self._get_close_time_for_date(chicago_dt)
-        flatten_time = self._get_flatten_time_for_date(chicago_dt)
+        return False, f"Market closed ({close_time} - {self.DAILY_REOPEN_TIME} CT)"
 
-        if close_time <= current_time < self.DAILY_REOPEN_TIME:
-            return False, f"Market closed ({close_time} - {self.DAILY_REOPEN_TIME} CT)"
 
-        if flatten_time <= current_time < close_time:
-            return False, f"Flatten window ({flatten_time} - {close_time} CT)"
+# Convenience function for simple usage
+@lru_cache(maxsize=8)
+def _get_handler(calendar_items: FrozenSet[tuple]) -> CMETradingHours:
+    """Build (once per distinct calendar) the handler shared by the convenience functions."""
+    return CMETradingHours(dict(calendar_items))
 
-        return True, f"Trading allowed ({day_names[weekday]} {current_time} CT)"
+
+def _handler_for(early_close_calendar: Optional[dict]) -> CMETradingHours:
+    """
+    Get the cached handler for a calendar.
+
+    Args:
+        early_close_calendar: Optional dict of early close dates
+
+    Returns:
+        CMETradingHours instance shared by every call with the same calendar
+    """
+    calendar_items = frozenset(
+        (day, tuple(close)) for day, close in (early_close_calendar or {}).items()
+    )
+    return _get_handler(calendar_items)
 
 
-# Convenience function for simple usage
 def is_trading_allowed(dt: datetime, early_close_calendar: Optional[dict] = None) -> bool:
     """
     Quick check if trading is allowed at the given time.
@@ -270,8 +397,7 @@ def is_trading_allowed(dt: datetime, early_close_calendar: Optional[dict] = None
     Returns:
         True if trading is allowed
     """
-    handler = CMETradingHours(early_close_calendar)
-    return handler.is_trading_allowed(dt)
+    return _handler_for(early_close_calendar).is_trading_allowed(dt)
 
 
 def should_flatten_positions(dt: datetime, early_close_calendar: Optional[dict] = None) -> bool:
@@ -285,5 +411,4 @@ def should_flatten_positions(dt: datetime, early_close_calendar: Optional[dict]
     Returns:
         True if positions should be flattened
     """
-    handler = CMETradingHours(early_close_calendar)
-    return handler.should_flatten_positions(dt)
+    return _handler_for(early_close_calendar).should_flatten_positions(dt)
@@ -0,0 +1,17 @@
+"""
+Environment configuration for the trading bot.
+The .env file is read once, the first time this module is imported.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRADOVATE_API_URL = os.getenv("TRADOVATE_API_URL")
+TRADOVATE_USERNAME = os.getenv("TRADOVATE_USERNAME")
+TRADOVATE_PASSWORD = os.getenv("TRADOVATE_PASSWORD")
+TRADOVATE_CLIENT_ID = os.getenv("TRADOVATE_CLIENT_ID")
+TRADOVATE_CID = os.getenv("TRADOVATE_CID")
+TRADOVATE_SECRET = os.getenv("TRADOVATE_SECRET")
+
+IS_LONG_ONLY_TRADE = os.getenv("IS_LONG_ONLY_TRADE")
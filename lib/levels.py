@@ -0,0 +1,28 @@
+"""
+Static price levels shared by the live bot, the backtest and the optimizer.
+The levels are stored once, as a sorted float64 array in data/static_levels.npy.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+
+STATIC_LEVELS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "static_levels.npy")
+
+
+@lru_cache(maxsize=None)
+def get_static_levels(path=STATIC_LEVELS_FILE):
+    """
+    Load the static levels, once per process.
+    
+    The array is memory-mapped read-only, so every strategy (and every forked
+    worker) shares the same pages instead of holding its own copy.
+    
+    Args:
+        path: .npy file holding the sorted levels
+    
+    Returns:
+        Read-only float64 NumPy array of levels
+    """
+    return np.load(path, mmap_mode="r")
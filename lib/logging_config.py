@@ -2,22 +2,46 @@
 Logging configuration for the trading bot.
 Only strategy.log is created - all other logging is disabled.
 """
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
 from datetime import datetime
 
-def setup_logging(log_dir="logs", log_level=logging.INFO):
+# The formatters only use asctime and message, so skip collecting caller, thread and
+# process details on every record (see "Optimization" in the logging HOWTO)
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Background thread that drains the strategy log queue into the real handlers
+_listener = None
+
+
+def _stop_listener():
+    """Stop the queue listener, writing out any records still queued, and close its handlers."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def setup_logging(log_dir="logs", log_level=logging.INFO, enable_file=True):
     """
     Set up minimal logging - only strategy execution.
     
     Args:
         log_dir: Directory to store log files
         log_level: Logging level (default: INFO)
+        enable_file: Write strategy.log; when False only the console handler is
+            installed and no log directory or file is created (e.g. backtests)
     """
     # Create logs directory if it doesn't exist
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    if enable_file:
+        os.makedirs(log_dir, exist_ok=True)
     
     # Create formatter
     formatter = logging.Formatter(
@@ -31,14 +55,16 @@ def setup_logging(log_dir="logs", log_level=logging.INFO):
     console_handler.setFormatter(formatter)
     
     # Strategy log file - rotating by size (5MB per file, keep 3 backups)
-    strategy_file_handler = RotatingFileHandler(
-        os.path.join(log_dir, 'strategy.log'),
-        maxBytes=5*1024*1024,  # 5MB
-        backupCount=3,
-        encoding='utf-8'
-    )
-    strategy_file_handler.setLevel(logging.INFO)
-    strategy_file_handler.setFormatter(formatter)
+    strategy_file_handler = None
+    if enable_file:
+        strategy_file_handler = RotatingFileHandler(
+            os.path.join(log_dir, 'strategy.log'),
+            maxBytes=5*1024*1024,  # 5MB
+            backupCount=3,
+            encoding='utf-8'
+        )
+        strategy_file_handler.setLevel(logging.INFO)
+        strategy_file_handler.setFormatter(formatter)
     
     # Disable ALL logging by default
     logging.disable(logging.CRITICAL)
@@ -54,8 +80,20 @@ def setup_logging(log_dir="logs", log_level=logging.INFO):
     # Configure strategy logger - ONLY logger we use
     strategy_logger = logging.getLogger('strategy')
     strategy_logger.handlers.clear()
-    strategy_logger.addHandler(strategy_file_handler)
-    strategy_logger.addHandler(console_handler)
+    sink_handlers = [console_handler]
+    if strategy_file_handler is not None:
+        sink_handlers.append(strategy_file_handler)
+    
+    # The strategy logger only enqueues records; console and file I/O happen on the listener thread
+    global _listener
+    _stop_listener()
+    log_queue = SimpleQueue()
+    _listener = QueueListener(log_queue, *sink_handlers, respect_handler_level=True)
+    _listener.start()
+    # Registered once however often setup_logging runs; drains the queue at exit
+    atexit.unregister(_stop_listener)
+    atexit.register(_stop_listener)
+    strategy_logger.addHandler(QueueHandler(log_queue))
     strategy_logger.setLevel(logging.INFO)
     strategy_logger.propagate = False
     
@@ -1,13 +1,105 @@
 import sqlite3
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set
 import threading
+from collections import defaultdict
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
 
 # Use the database logger configured in logging_config
 db_logger = logging.getLogger('database')
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch_ns(value):
+    """
+    Encode a naive datetime as integer nanoseconds since the epoch (wall clock, no tz shift).
+    
+    Args:
+        value: Trade timestamp (datetime/pandas Timestamp, or a string from older state)
+        
+    Returns:
+        int for naive datetimes; timezone-aware values and anything else keep their string form
+    """
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return (value - _EPOCH) // timedelta(microseconds=1) * 1000 + getattr(value, 'nanosecond', 0)
+    return str(value)
+
+
+def _from_epoch_ns(value):
+    """
+    Decode a timestamp written by _to_epoch_ns back to a naive timestamp.
+    
+    Args:
+        value: int nanoseconds since the epoch, or a string timestamp
+        
+    Returns:
+        pandas Timestamp (a datetime, exact to the nanosecond) for ints; strings are returned unchanged
+    """
+    if isinstance(value, int):
+        return pd.Timestamp(value)
+    return value
+
+# Statements executed on every save, defined once so each call reuses the same SQL text
+# (and therefore the same entry in the connection's prepared-statement cache)
+_SQL_UPSERT_STATE = '''
+    INSERT INTO strategy_state 
+    (strategy_name, current_cash_value, open_trade_count, total_pnl,
+     price, last_price, high_price, low_price, last_index,
+     winrate, avg_winner, avg_loser, total_trade, reward_to_risk,
+     max_losing_streak, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(strategy_name) DO UPDATE SET
+        current_cash_value = excluded.current_cash_value,
+        open_trade_count = excluded.open_trade_count,
+        total_pnl = excluded.total_pnl,
+        price = excluded.price,
+        last_price = excluded.last_price,
+        high_price = excluded.high_price,
+        low_price = excluded.low_price,
+        last_index = excluded.last_index,
+        winrate = excluded.winrate,
+        avg_winner = excluded.avg_winner,
+        avg_loser = excluded.avg_loser,
+        total_trade = excluded.total_trade,
+        reward_to_risk = excluded.reward_to_risk,
+        max_losing_streak = excluded.max_losing_streak,
+        last_updated = excluded.last_updated
+'''
+
+_SQL_INSERT_TRADE_BLOCK = '''
+    INSERT INTO trade_history_blocks 
+    (strategy_name, trade_count, trades)
+    VALUES (?, ?, ?)
+'''
+
+_SQL_DELETE_OPEN_TRADES = 'DELETE FROM open_trades WHERE strategy_name = ?'
+
+_SQL_INSERT_OPEN_TRADE = '''
+    INSERT INTO open_trades 
+    (strategy_name, trade_time, entry_price, stop_level, 
+     trailing_stop, traded_level, take_profit_level)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_UPSERT_RETRACE_LEVEL = '''
+    INSERT OR REPLACE INTO retrace_levels 
+    (strategy_name, level_index, direction)
+    VALUES (?, ?, ?)
+'''
+
+_SQL_APPEND_PNL_VALUES = '''
+    INSERT INTO cumulative_pnl_blob (strategy_name, pnl_values)
+    VALUES (?, ?)
+    ON CONFLICT(strategy_name) DO UPDATE SET
+        pnl_values = CAST(pnl_values || excluded.pnl_values AS BLOB)
+'''
+
 class StatePersistence:
     """
     Manages SQLite persistence for trading strategy state.
@@ -23,14 +115,71 @@ class StatePersistence:
         """
         self.db_path = db_path
         self.lock = threading.Lock()
+        # Writers (and loads, which seed the per-strategy caches) only serialize per strategy.
+        # Each thread has its own connection, so SQLite/WAL handles cross-strategy concurrency.
+        self._strategy_locks = defaultdict(threading.Lock)
+        # One connection per thread, opened on first use and reused for every call after that
+        self._local = threading.local()
+        # Every connection opened by any thread, so close() can release them all
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+        # Rows last committed per strategy, so unchanged tables are not rewritten on every save
+        self._written_open_trades: Dict[str, tuple] = {}
+        self._written_retrace_levels: Dict[str, tuple] = {}
+        self._static_levels_saved: Set[str] = set()
+        # Rows already stored per strategy for the append-only tables, so saves don't COUNT(*) each time
+        self._trade_history_count: Dict[str, int] = {}
+        self._cumulative_pnl_count: Dict[str, int] = {}
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection with the per-connection pragmas applied."""
+        # Each connection is only used by the thread that opened it, but close() may run on another
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # With WAL this skips the per-commit fsync (only checkpoints sync). The DB can't be
+        # corrupted; a power loss can at worst drop the last few commits.
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Checkpoint the WAL every ~1000 pages, keep temp tables in memory, 20 MB page cache
+        conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        # Serve reads from a memory mapping of the file (up to 256 MB) instead of read() per page
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get this thread's cached database connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn not in self._connections:  # not opened yet, or released by close()
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.add(conn)
+        return conn
+    
+    def close(self):
+        """Close every thread's cached database connection (e.g. those of to_thread workers)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        # Other threads notice their closed connection in _get_connection and reopen on next use
+        self._local.conn = None
+    
     def _init_database(self):
         """Initialize database tables if they don't exist."""
         with self.lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             cursor = conn.cursor()
             
+            # Larger pages for the history blobs. Only takes effect on a new, empty database and
+            # has to be set before switching to WAL; existing databases keep their page size.
+            cursor.execute('PRAGMA page_size=8192')
+            
+            # Write-ahead logging: one fsync per commit and readers don't block the writer.
+            # The journal mode is persistent, so it only needs to be set once per database.
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Table for strategy state
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS strategy_state (
@@ -97,6 +246,19 @@ class StatePersistence:
                 )
             ''')
             
+            # Trade history appended as one JSON block of new trades per save. Rows in the
+            # per-trade trade_history table (older databases) are still loaded first.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trade_history_blocks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    strategy_name TEXT NOT NULL,
+                    trade_count INTEGER NOT NULL,
+                    trades TEXT NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (strategy_name) REFERENCES strategy_state(strategy_name)
+                )
+            ''')
+            
             # Table for cumulative PnL
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS cumulative_pnl (
@@ -109,6 +271,16 @@ class StatePersistence:
                 )
             ''')
             
+            # Cumulative PnL as one packed float64 array per strategy; new values are appended
+            # to the blob. Rows in the per-value cumulative_pnl table (older databases) load first.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS cumulative_pnl_blob (
+                    strategy_name TEXT PRIMARY KEY,
+                    pnl_values BLOB NOT NULL,
+                    FOREIGN KEY (strategy_name) REFERENCES strategy_state(strategy_name)
+                )
+            ''')
+            
             # Table for static levels (for reference)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS static_levels (
@@ -121,8 +293,23 @@ class StatePersistence:
                 )
             ''')
             
+            # Broker account id resolved for each traded symbol, so restarts skip the account lookup
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS account_ids (
+                    symbol TEXT PRIMARY KEY,
+                    account_id INTEGER NOT NULL,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Per-strategy lookups and ordered loads. retrace_levels and static_levels are
+            # already covered by their UNIQUE(strategy_name, level_index) constraints.
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_strategy ON trade_history(strategy_name, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_blocks_strategy ON trade_history_blocks(strategy_name, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_open_trades_strategy ON open_trades(strategy_name, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_cumulative_pnl_strategy ON cumulative_pnl(strategy_name, sequence_number)')
+            
             conn.commit()
-            conn.close()
             db_logger.info(f"Database initialized at {self.db_path}")
     
     def save_strategy_state(self, strategy_name: str, state: Dict[str, Any]):
@@ -133,20 +320,18 @@ class StatePersistence:
             strategy_name: Unique name for the strategy
             state: Dictionary containing all strategy state
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._strategy_locks[strategy_name]:
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             try:
+                # One write transaction for the whole save (including the row-count reads): a single
+                # commit, and the write lock is taken up front instead of upgrading mid-save
+                cursor.execute('BEGIN IMMEDIATE')
+                
                 # Save main strategy state
-                cursor.execute('''
-                    INSERT OR REPLACE INTO strategy_state 
-                    (strategy_name, current_cash_value, open_trade_count, total_pnl,
-                     price, last_price, high_price, low_price, last_index,
-                     winrate, avg_winner, avg_loser, total_trade, reward_to_risk,
-                     max_losing_streak, last_updated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ''', (
+                # Upsert: updates the existing row in place rather than delete + reinsert
+                cursor.execute(_SQL_UPSERT_STATE, (
                     strategy_name,
                     state.get('current_cash_value', 0),
                     state.get('open_trade_count', 0),
@@ -164,84 +349,90 @@ class StatePersistence:
                     state.get('max_losing_streak', 0)
                 ))
                 
-                # Save trade history (clear and reinsert to avoid duplicates)
+                # Save trade history (append-only)
                 # Only save new trades by checking what's already in DB
-                cursor.execute('''
-                    SELECT COUNT(*) FROM trade_history WHERE strategy_name = ?
-                ''', (strategy_name,))
-                existing_count = cursor.fetchone()[0]
+                existing_count = self._trade_history_count.get(strategy_name)
+                if existing_count is None:
+                    cursor.execute('''
+                        SELECT (SELECT COUNT(*) FROM trade_history WHERE strategy_name = ?) +
+                               (SELECT COALESCE(SUM(trade_count), 0) FROM trade_history_blocks WHERE strategy_name = ?)
+                    ''', (strategy_name, strategy_name))
+                    existing_count = cursor.fetchone()[0]
                 
                 trade_history = state.get('trade_history', [])
                 new_trades = trade_history[existing_count:]
                 
-                for trade in new_trades:
-                    cursor.execute('''
-                        INSERT INTO trade_history 
-                        (strategy_name, trade_index, trade_type, price, pnl)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (strategy_name, str(trade[0]), trade[1], trade[2], trade[3]))
-                
-                # Save open trades (clear and reinsert)
-                cursor.execute('DELETE FROM open_trades WHERE strategy_name = ?', (strategy_name,))
-                for trade in state.get('open_trade_list', []):
-                    cursor.execute('''
-                        INSERT INTO open_trades 
-                        (strategy_name, trade_time, entry_price, stop_level, 
-                         trailing_stop, traded_level, take_profit_level)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (strategy_name, str(trade[0]), trade[1], trade[2], 
-                          trade[3], trade[4], trade[5]))
-                
-                # Save retrace levels (update or insert)
-                for level_idx, direction in state.get('retrace_levels', {}).items():
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO retrace_levels 
-                        (strategy_name, level_index, direction)
-                        VALUES (?, ?, ?)
-                    ''', (strategy_name, level_idx, direction))
+                # All new trades go into a single row instead of one row per trade
+                if new_trades:
+                    cursor.execute(_SQL_INSERT_TRADE_BLOCK, (strategy_name, len(new_trades), json.dumps(
+                        [[_to_epoch_ns(trade[0]), trade[1], float(trade[2]), float(trade[3])] for trade in new_trades])))
+                
+                # Save open trades (clear and reinsert, only when they changed since the last save)
+                open_trade_rows = tuple((strategy_name, str(trade[0]), trade[1], trade[2], 
+                                         trade[3], trade[4], trade[5]) for trade in state.get('open_trade_list', []))
+                open_trades_changed = self._written_open_trades.get(strategy_name) != open_trade_rows
+                if open_trades_changed:
+                    cursor.execute(_SQL_DELETE_OPEN_TRADES, (strategy_name,))
+                    cursor.executemany(_SQL_INSERT_OPEN_TRADE, open_trade_rows)
+                
+                # Save retrace levels (update or insert, only when they changed since the last save)
+                retrace_rows = tuple((strategy_name, level_idx, direction)
+                                     for level_idx, direction in state.get('retrace_levels', {}).items())
+                retrace_changed = self._written_retrace_levels.get(strategy_name) != retrace_rows
+                if retrace_changed:
+                    cursor.executemany(_SQL_UPSERT_RETRACE_LEVEL, retrace_rows)
                 
                 # Save cumulative PnL (only new values)
-                cursor.execute('''
-                    SELECT COUNT(*) FROM cumulative_pnl WHERE strategy_name = ?
-                ''', (strategy_name,))
-                existing_pnl_count = cursor.fetchone()[0]
+                existing_pnl_count = self._cumulative_pnl_count.get(strategy_name)
+                if existing_pnl_count is None:
+                    cursor.execute('''
+                        SELECT (SELECT COUNT(*) FROM cumulative_pnl WHERE strategy_name = ?) +
+                               (SELECT COALESCE(SUM(LENGTH(pnl_values)), 0) / 8 FROM cumulative_pnl_blob WHERE strategy_name = ?)
+                    ''', (strategy_name, strategy_name))
+                    existing_pnl_count = cursor.fetchone()[0]
                 
                 cumulative_pnl = state.get('cumulative_pnl', [])
                 new_pnl_values = cumulative_pnl[existing_pnl_count:]
                 
-                for idx, pnl_value in enumerate(new_pnl_values, start=existing_pnl_count):
-                    cursor.execute('''
-                        INSERT INTO cumulative_pnl 
-                        (strategy_name, sequence_number, pnl_value)
-                        VALUES (?, ?, ?)
-                    ''', (strategy_name, idx, pnl_value))
+                # Append the new values to the strategy's packed array (8 bytes per value)
+                if new_pnl_values:
+                    cursor.execute(_SQL_APPEND_PNL_VALUES, (strategy_name, np.asarray(new_pnl_values, dtype=np.float64).tobytes()))
                 
                 # Save static levels if provided (only once)
-                if state.get('static_levels'):
+                if state.get('static_levels') and strategy_name not in self._static_levels_saved:
                     cursor.execute('''
                         SELECT COUNT(*) FROM static_levels WHERE strategy_name = ?
                     ''', (strategy_name,))
                     if cursor.fetchone()[0] == 0:
-                        for idx, level in enumerate(state['static_levels']):
-                            cursor.execute('''
-                                INSERT INTO static_levels 
-                                (strategy_name, level_value, level_index)
-                                VALUES (?, ?, ?)
-                            ''', (strategy_name, level, idx))
+                        cursor.executemany('''
+                            INSERT INTO static_levels 
+                            (strategy_name, level_value, level_index)
+                            VALUES (?, ?, ?)
+                        ''', [(strategy_name, level, idx) for idx, level in enumerate(state['static_levels'])])
                 
                 conn.commit()
+                
+                # Only remember what was written once it is committed
+                self._trade_history_count[strategy_name] = existing_count + len(new_trades)
+                self._cumulative_pnl_count[strategy_name] = existing_pnl_count + len(new_pnl_values)
+                if open_trades_changed:
+                    self._written_open_trades[strategy_name] = open_trade_rows
+                if retrace_changed:
+                    self._written_retrace_levels[strategy_name] = retrace_rows
+                if state.get('static_levels'):
+                    self._static_levels_saved.add(strategy_name)
                 db_logger.info(f"Successfully saved state to DB for strategy: {strategy_name}")
-                db_logger.debug(f"  - Saved {len(new_trades)} new trades (total history: {len(trade_history)})")
-                db_logger.debug(f"  - Saved {len(state.get('open_trade_list', []))} open trades")
-                db_logger.debug(f"  - Saved {len(new_pnl_values)} new PnL values")
-                db_logger.debug(f"  - Saved {len([v for v in state.get('retrace_levels', {}).values() if v is not None])} active retrace levels")
+                if db_logger.isEnabledFor(logging.DEBUG):
+                    active_retraces = sum(1 for v in state.get('retrace_levels', {}).values() if v is not None)
+                    db_logger.debug(f"  - Saved {len(new_trades)} new trades (total history: {len(trade_history)})")
+                    db_logger.debug(f"  - Saved {len(state.get('open_trade_list', []))} open trades")
+                    db_logger.debug(f"  - Saved {len(new_pnl_values)} new PnL values")
+                    db_logger.debug(f"  - Saved {active_retraces} active retrace levels")
                 
             except Exception as e:
                 conn.rollback()
                 db_logger.error(f"Failed to save strategy state to DB for {strategy_name}: {e}", exc_info=True)
                 raise
-            finally:
-                conn.close()
     
     def load_strategy_state(self, strategy_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -253,8 +444,8 @@ class StatePersistence:
         Returns:
             Dictionary containing all strategy state, or None if not found
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._strategy_locks[strategy_name]:
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             try:
@@ -297,14 +488,20 @@ class StatePersistence:
                     ORDER BY id
                 ''', (strategy_name,))
                 
-                state['trade_history'] = []
-                for trade_row in cursor.fetchall():
-                    state['trade_history'].append((
-                        trade_row[0],  # Keep as string, will be converted as needed
-                        trade_row[1],
-                        trade_row[2],
-                        trade_row[3]
-                    ))
+                # Rows already come back as (trade_index, trade_type, price, pnl) tuples;
+                # trade_index is a string in these older rows and a datetime in the blocks below
+                state['trade_history'] = cursor.fetchall()
+                
+                cursor.execute('''
+                    SELECT trades
+                    FROM trade_history_blocks 
+                    WHERE strategy_name = ?
+                    ORDER BY id
+                ''', (strategy_name,))
+                
+                for block_row in cursor:
+                    state['trade_history'].extend(
+                        (_from_epoch_ns(trade[0]), trade[1], trade[2], trade[3]) for trade in json.loads(block_row[0]))
                 
                 # Load open trades
                 cursor.execute('''
@@ -315,16 +512,8 @@ class StatePersistence:
                     ORDER BY id
                 ''', (strategy_name,))
                 
-                state['open_trade_list'] = []
-                for trade_row in cursor.fetchall():
-                    state['open_trade_list'].append([
-                        trade_row[0],  # Keep as string
-                        trade_row[1],
-                        trade_row[2],
-                        trade_row[3],
-                        trade_row[4],
-                        trade_row[5]
-                    ])
+                # trade_time is kept as a string
+                state['open_trade_list'] = [list(trade_row) for trade_row in cursor]
                 
                 # Load retrace levels
                 cursor.execute('''
@@ -334,9 +523,7 @@ class StatePersistence:
                     ORDER BY level_index
                 ''', (strategy_name,))
                 
-                state['retrace_levels'] = {}
-                for level_row in cursor.fetchall():
-                    state['retrace_levels'][level_row[0]] = level_row[1]  # direction: 'up', 'down', or None
+                state['retrace_levels'] = dict(cursor)  # level_index -> direction: 'up', 'down', or None
                 
                 # Load cumulative PnL
                 cursor.execute('''
@@ -346,7 +533,14 @@ class StatePersistence:
                     ORDER BY sequence_number
                 ''', (strategy_name,))
                 
-                state['cumulative_pnl'] = [row[0] for row in cursor.fetchall()]
+                state['cumulative_pnl'] = [row[0] for row in cursor]
+                
+                cursor.execute('''
+                    SELECT pnl_values FROM cumulative_pnl_blob WHERE strategy_name = ?
+                ''', (strategy_name,))
+                blob_row = cursor.fetchone()
+                if blob_row:
+                    state['cumulative_pnl'].extend(np.frombuffer(blob_row[0], dtype=np.float64).tolist())
                 
                 # Load static levels
                 cursor.execute('''
@@ -356,22 +550,25 @@ class StatePersistence:
                     ORDER BY level_index
                 ''', (strategy_name,))
                 
-                state['static_levels'] = [row[0] for row in cursor.fetchall()]
+                state['static_levels'] = [row[0] for row in cursor]
+                
+                self._trade_history_count[strategy_name] = len(state['trade_history'])
+                self._cumulative_pnl_count[strategy_name] = len(state['cumulative_pnl'])
                 
                 db_logger.info(f"Successfully loaded state from DB for strategy: {strategy_name}")
-                db_logger.debug(f"  - Loaded {len(state['trade_history'])} trades from history")
-                db_logger.debug(f"  - Loaded {len(state['open_trade_list'])} open trades")
-                db_logger.debug(f"  - Loaded {len(state['cumulative_pnl'])} PnL values")
-                db_logger.debug(f"  - Loaded {len([v for v in state['retrace_levels'].values() if v is not None])} active retrace levels")
-                db_logger.debug(f"  - Total PnL: {state['total_pnl']}")
-                db_logger.debug(f"  - Open trade count: {state['open_trade_count']}")
+                if db_logger.isEnabledFor(logging.DEBUG):
+                    active_retraces = sum(1 for v in state['retrace_levels'].values() if v is not None)
+                    db_logger.debug(f"  - Loaded {len(state['trade_history'])} trades from history")
+                    db_logger.debug(f"  - Loaded {len(state['open_trade_list'])} open trades")
+                    db_logger.debug(f"  - Loaded {len(state['cumulative_pnl'])} PnL values")
+                    db_logger.debug(f"  - Loaded {active_retraces} active retrace levels")
+                    db_logger.debug(f"  - Total PnL: {state['total_pnl']}")
+                    db_logger.debug(f"  - Open trade count: {state['open_trade_count']}")
                 return state
                 
             except Exception as e:
                 db_logger.error(f"Failed to load strategy state from DB for {strategy_name}: {e}", exc_info=True)
                 raise
-            finally:
-                conn.close()
     
     def delete_strategy_state(self, strategy_name: str):
         """
@@ -380,27 +577,48 @@ class StatePersistence:
         Args:
             strategy_name: Unique name for the strategy
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        self.delete_many([strategy_name])
+    
+    def delete_many(self, strategy_names: List[str]):
+        """
+        Delete all state for several strategies in a single transaction.
+        
+        Args:
+            strategy_names: Unique names of the strategies to delete
+        """
+        params = [(strategy_name,) for strategy_name in strategy_names]
+        
+        with ExitStack() as stack:
+            # Acquire in a fixed order so concurrent multi-strategy deletes can't deadlock
+            for strategy_name in sorted(set(strategy_names)):
+                stack.enter_context(self._strategy_locks[strategy_name])
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             try:
-                cursor.execute('DELETE FROM trade_history WHERE strategy_name = ?', (strategy_name,))
-                cursor.execute('DELETE FROM open_trades WHERE strategy_name = ?', (strategy_name,))
-                cursor.execute('DELETE FROM retrace_levels WHERE strategy_name = ?', (strategy_name,))
-                cursor.execute('DELETE FROM cumulative_pnl WHERE strategy_name = ?', (strategy_name,))
-                cursor.execute('DELETE FROM static_levels WHERE strategy_name = ?', (strategy_name,))
-                cursor.execute('DELETE FROM strategy_state WHERE strategy_name = ?', (strategy_name,))
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.executemany('DELETE FROM trade_history WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM trade_history_blocks WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM open_trades WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM retrace_levels WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM cumulative_pnl WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM cumulative_pnl_blob WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM static_levels WHERE strategy_name = ?', params)
+                cursor.executemany('DELETE FROM strategy_state WHERE strategy_name = ?', params)
                 
                 conn.commit()
-                db_logger.info(f"Deleted state for strategy: {strategy_name}")
+                for strategy_name in strategy_names:
+                    self._written_open_trades.pop(strategy_name, None)
+                    self._written_retrace_levels.pop(strategy_name, None)
+                    self._static_levels_saved.discard(strategy_name)
+                    self._trade_history_count.pop(strategy_name, None)
+                    self._cumulative_pnl_count.pop(strategy_name, None)
+                    db_logger.info(f"Deleted state for strategy: {strategy_name}")
                 
             except Exception as e:
                 conn.rollback()
-                db_logger.error(f"Error deleting strategy state for {strategy_name}: {e}", exc_info=True)
+                db_logger.error(f"Error deleting strategy state for {', '.join(strategy_names)}: {e}", exc_info=True)
                 raise
-            finally:
-                conn.close()
     
     def list_strategies(self) -> List[str]:
         """
@@ -409,15 +627,46 @@ class StatePersistence:
         Returns:
             List of strategy names
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        # Read-only: no lock needed, WAL readers don't block (or get blocked by) the writer
+        cursor = self._get_connection().cursor()
+        cursor.execute('SELECT strategy_name FROM strategy_state')
+        return [row[0] for row in cursor.fetchall()]
+    
+    def get_account_id(self, symbol: str) -> Optional[int]:
+        """
+        Get the broker account id stored for a symbol.
+        
+        Args:
+            symbol: Traded symbol (e.g., 'ESH6')
             
-            try:
-                cursor.execute('SELECT strategy_name FROM strategy_state')
-                return [row[0] for row in cursor.fetchall()]
-            finally:
-                conn.close()
+        Returns:
+            Account id or None if none is stored
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute('SELECT account_id FROM account_ids WHERE symbol = ?', (symbol,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def set_account_id(self, symbol: str, account_id: Optional[int]):
+        """
+        Store the broker account id for a symbol.
+        
+        Args:
+            symbol: Traded symbol (e.g., 'ESH6')
+            account_id: Account id, or None to forget the stored one
+        """
+        conn = self._get_connection()
+        if account_id is None:
+            conn.execute('DELETE FROM account_ids WHERE symbol = ?', (symbol,))
+        else:
+            conn.execute('''
+                INSERT INTO account_ids (symbol, account_id, last_updated)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    account_id = excluded.account_id,
+                    last_updated = excluded.last_updated
+            ''', (symbol, account_id))
+        conn.commit()
     
     def get_last_update_time(self, strategy_name: str) -> Optional[str]:
         """
@@ -429,18 +678,12 @@ class StatePersistence:
         Returns:
             Timestamp string or None if not found
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            try:
-                cursor.execute('''
-                    SELECT last_updated 
-                    FROM strategy_state 
-                    WHERE strategy_name = ?
-                ''', (strategy_name,))
-                
-                row = cursor.fetchone()
-                return row[0] if row else None
-            finally:
-                conn.close()
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT last_updated 
+            FROM strategy_state 
+            WHERE strategy_name = ?
+        ''', (strategy_name,))
+        
+        row = cursor.fetchone()
+        return row[0] if row else None
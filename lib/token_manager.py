@@ -1,84 +1,157 @@
+import asyncio
+import logging
 import threading
 import httpx
 import time
-from dotenv import load_dotenv
-import os
 
-load_dotenv()
+from lib.config import (
+    TRADOVATE_API_URL, TRADOVATE_USERNAME, TRADOVATE_PASSWORD,
+    TRADOVATE_CLIENT_ID, TRADOVATE_CID, TRADOVATE_SECRET
+)
 
-TRADOVATE_API_URL = os.getenv("TRADOVATE_API_URL")
-TRADOVATE_USERNAME = os.getenv("TRADOVATE_USERNAME")
-TRADOVATE_PASSWORD = os.getenv("TRADOVATE_PASSWORD")
-TRADOVATE_CLIENT_ID = os.getenv("TRADOVATE_CLIENT_ID")
-TRADOVATE_CID = os.getenv("TRADOVATE_CID")
-TRADOVATE_SECRET = os.getenv("TRADOVATE_SECRET")
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger('strategy')
+
+# Retry policy for transient gateway errors on auth requests
+RETRY_STATUS_CODES = {502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Shared client so token requests reuse the pooled TCP/TLS connection instead of
+# doing a fresh handshake on every refresh. The transport retries failed connects.
+_client = httpx.Client(
+    timeout=httpx.Timeout(15.0, connect=5.0),
+    # An explicit transport owns the pool settings; the client-level limits/http2 would be ignored
+    transport=httpx.HTTPTransport(
+        retries=MAX_RETRIES,
+        http2=HAS_HTTP2,
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+    ),
+)
+
+
+def _request_with_retry(method, url, **kwargs):
+    """Send a request on the shared client, retrying transient gateway errors with backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        res = _client.request(method, url, **kwargs)
+        if res.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+            return res
+        logger.debug("Got %s, retrying (%d/%d)...", res.status_code, attempt + 1, MAX_RETRIES)
+        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+def _parse_json(res):
+    """Decode a JSON response body, with orjson when it is installed."""
+    return orjson.loads(res.content) if HAS_ORJSON else res.json()
 
 class TokenManager:
     def __init__(self, refresh_interval=30 * 60):
-        print("[DEBUG] Initializing TokenManager...")
+        logger.debug("Initializing TokenManager...")
         self.token = None
         self.refresh_interval = refresh_interval
         self.lock = threading.Lock()
+        self._refresh_task = None
+
+    async def start(self):
+        """Fetch the initial token and schedule the refresh loop on the running event loop."""
+        logger.debug("Starting token manager...")
+        self.token = await asyncio.to_thread(self.get_access_token)
+        logger.debug("Starting refresh token task...")
+        self._refresh_task = asyncio.create_task(self._refresh_token_loop())
 
-    def start(self):
-        print("[DEBUG] Starting token manager...")
-        self.token = self.get_access_token()
-        print("[DEBUG] Starting refresh token thread...")
-        thread = threading.Thread(target=self._refresh_token_loop, daemon=True)
-        thread.start()
+    async def stop(self):
+        """Cancel the refresh loop."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
 
-    def _refresh_token_loop(self):
+    async def _refresh_token_loop(self):
         while True:
-            print(f"[DEBUG] Sleeping for {self.refresh_interval} seconds before token renewal...")
-            time.sleep(self.refresh_interval)
-            with self.lock:
-                try:
-                    self.token = self.renew_access_token(self.token)
-                    print("[DEBUG] Token successfully renewed inside loop.")
-                except Exception as e:
-                    print(f"[ERROR] Failed to renew access token: {e}")
+            logger.debug("Sleeping for %s seconds before token renewal...", self.refresh_interval)
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                # The HTTP call is blocking; run it off the event loop so webhooks keep being served
+                await asyncio.to_thread(self.refresh_if_needed, self.token)
+                logger.debug("Token successfully renewed inside loop.")
+            except Exception as e:
+                logger.error("Failed to renew access token: %s", e)
 
     def get_token(self):
+        # No lock needed: self.token is only ever rebound to a new string, and a
+        # single attribute load/store is atomic under the GIL.
+        return self.token
+
+    def refresh_if_needed(self, current_token):
+        """
+        Renew the access token unless another thread already replaced current_token.
+
+        Callers pass the token they saw fail (or went stale); if several threads do
+        this at once only the first one hits the API and the rest reuse its result.
+        An expired token can't be renewed (the renew itself gets a 401), so in that
+        case a new token is requested with the credentials instead.
+        """
         with self.lock:
-            print("[DEBUG] Fetching current access token...")
-            return self.token
+            if self.token != current_token:
+                logger.debug("Token already refreshed by another thread.")
+                return self.token
+            try:
+                new_token = self.renew_access_token(current_token)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 401:
+                    raise
+                logger.debug("Token can no longer be renewed, requesting a new one.")
+                new_token = self.get_access_token()
+            self.token = new_token
+            return new_token
         
     def get_access_token(self):
-        print("[DEBUG] Requesting initial access token...")
-        with httpx.Client() as client:
-            res = client.post(f"{TRADOVATE_API_URL}/auth/accesstokenrequest", 
-                headers={
-                    "accept": "application/json",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "name": TRADOVATE_USERNAME,
-                    "password": TRADOVATE_PASSWORD,
-                    "appId": TRADOVATE_CLIENT_ID,
-                    "appVersion": "0.0.1",
-                    "cid": TRADOVATE_CID,
-                    "sec": TRADOVATE_SECRET
-                })
-
-            print(f"[DEBUG] Status Code: {res.status_code}")
-            res.raise_for_status()
-            data = res.json()
-            access_token = data["accessToken"]
-            print("[DEBUG] Access token obtained successfully.")
-            return access_token
+        logger.debug("Requesting initial access token...")
+        res = _request_with_retry("POST", f"{TRADOVATE_API_URL}/auth/accesstokenrequest",
+            headers={
+                "accept": "application/json",
+                "Content-Type": "application/json"
+            },
+            json={
+                "name": TRADOVATE_USERNAME,
+                "password": TRADOVATE_PASSWORD,
+                "appId": TRADOVATE_CLIENT_ID,
+                "appVersion": "0.0.1",
+                "cid": TRADOVATE_CID,
+                "sec": TRADOVATE_SECRET
+            })
+
+        logger.debug("Status Code: %s", res.status_code)
+        res.raise_for_status()
+        data = _parse_json(res)
+        access_token = data["accessToken"]
+        logger.debug("Access token obtained successfully.")
+        return access_token
 
     def renew_access_token(self, token: str):
-        print("[DEBUG] Attempting to renew access token...")
+        logger.debug("Attempting to renew access token...")
         headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
-        with httpx.Client() as client:
-            res = client.get(f"{TRADOVATE_API_URL}/auth/renewaccesstoken", headers=headers)
-            print(f"[DEBUG] Status Code (renew): {res.status_code}")
-            res.raise_for_status()
-            data = res.json()
-            access_token = data["accessToken"]
-            print("[DEBUG] Access token renewed successfully.")
-            return access_token
\ No newline at end of file
+        res = _request_with_retry("GET", f"{TRADOVATE_API_URL}/auth/renewaccesstoken", headers=headers)
+        logger.debug("Status Code (renew): %s", res.status_code)
+        res.raise_for_status()
+        data = _parse_json(res)
+        access_token = data["accessToken"]
+        logger.debug("Access token renewed successfully.")
+        return access_token
\ No newline at end of file
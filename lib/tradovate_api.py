@@ -1,95 +1,164 @@
+import logging
+import threading
+import time
 import httpx
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
+from lib.config import TRADOVATE_API_URL, TRADOVATE_USERNAME
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger('strategy')
+
+# How long a fetched net position is trusted when no order has been sent in the meantime
+NET_POSITION_MAX_AGE_SECONDS = 5.0
+# Responses after which a remembered account id is no longer trusted
+STALE_ACCOUNT_STATUS_CODES = {401, 404}
+
+def _parse_json(res):
+    """Decode a JSON response body, with orjson when it is installed."""
+    return orjson.loads(res.content) if HAS_ORJSON else res.json()
 
 class TradovateTrader:
-    def __init__(self, symbol, token_manager):
-        self.account_id = None
+    def __init__(self, symbol, token_manager, persistence=None,
+                 api_url=TRADOVATE_API_URL, username=TRADOVATE_USERNAME):
         self.symbol = symbol
-        self.username = os.getenv("TRADOVATE_USERNAME")
-        self.api_url = os.getenv("TRADOVATE_API_URL")
+        # Optional StatePersistence that remembers the account id across restarts
+        self.persistence = persistence
+        self.account_id = persistence.get_account_id(symbol) if persistence is not None else None
+        self.username = username
+        self.api_url = api_url
         self.token_manager = token_manager
+        # Last fetched netPos and when it was fetched; None means it must be fetched again
+        self._net_position = None
+        self._net_position_time = 0.0
+        # Serializes the account lookup so concurrent first orders issue a single /account/list
+        self._account_lock = threading.Lock()
+        # Order fields that only change with the account id, built on the first order
+        self._order_static = None
+        # One pooled client per trader: orders reuse the kept-alive TCP/TLS connection
+        # instead of paying a new handshake on every request
+        self.client = httpx.Client(
+            base_url=self.api_url or "",
+            # HTTP/2 multiplexes concurrent requests from parallel strategy updates over one connection
+            http2=HAS_HTTP2,
+            headers={"Accept": "application/json"},
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+        )
+
+    def close(self):
+        """Close the pooled HTTP client."""
+        self.client.close()
+
+    def _request(self, method, path, headers=None, **kwargs):
+        """Send an authorized request; on 401 renew the access token and retry once."""
+        headers = dict(headers or {})
+        access_token = self.token_manager.get_token()
+        headers["Authorization"] = f"Bearer {access_token}"
+        res = self.client.request(method, path, headers=headers, **kwargs)
+        if res.status_code == 401:
+            logger.debug("Got 401 from %s, renewing the access token and retrying.", path)
+            headers["Authorization"] = f"Bearer {self.token_manager.refresh_if_needed(access_token)}"
+            res = self.client.request(method, path, headers=headers, **kwargs)
+        return res
 
     def ensure_account_id(self):
-        if not self.account_id:
-            self.find_account_id()
+        if self.account_id:
+            return self.account_id
+        with self._account_lock:
+            # Another thread may have resolved it while we waited
+            if not self.account_id:
+                self.find_account_id()
         return self.account_id
 
     def find_account_id(self):
-        access_token = self.token_manager.get_token()
-        print("Finding account ID...")
-        headers = {"Authorization": f"Bearer {access_token}"}
+        logger.debug("Finding account ID...")
+        res = self._request("GET", "/account/list", params={"name": self.symbol})
+        res.raise_for_status()
+        accounts = _parse_json(res)
+        logger.debug("Found %d accounts.", len(accounts))
 
-        with httpx.Client() as client:
-            res = client.get(f"{self.api_url}/account/list", params={"name": self.symbol}, headers=headers)
-            res.raise_for_status()
-            accounts = res.json()
-            print(f"Found {len(accounts)} accounts.")
+        if not accounts:
+            raise ValueError("No accounts found.")
+        
+        self.account_id = accounts[0]["id"]
+        if self.persistence is not None:
+            self.persistence.set_account_id(self.symbol, self.account_id)
 
-            if not accounts:
-                raise ValueError("No accounts found.")
-            
-            self.account_id = accounts[0]["id"]
+    def _forget_account_id_if_stale(self, res):
+        """Drop the account id (and its stored copy) when the broker rejects requests made with it."""
+        if res.status_code in STALE_ACCOUNT_STATUS_CODES and self.account_id is not None:
+            logger.debug("Got %s, looking up the account id again on the next request.", res.status_code)
+            self.account_id = None
+            if self.persistence is not None:
+                self.persistence.set_account_id(self.symbol, None)
 
     def enter_position(self, quantity, is_long):
-        if quantity == 0:
-            print(f"Quantity is 0. Skipping order.")
+        # Checked before anything else so a no-op order never triggers the account lookup
+        if not quantity or quantity < 0:
+            logger.debug("Quantity is %s. Skipping order.", quantity)
             return False
         
         try:
             self.ensure_account_id()
             side = "Buy" if is_long else "Sell"
 
-            order = {
-                "accountSpec": self.username,
-                "accountId": self.account_id,
-                "action": side,
-                "symbol": self.symbol,
-                "orderQty": quantity,
-                "orderType": "Market",
-                "isAutomated": True
-            }
-
-            access_token = self.token_manager.get_token()
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-
-            with httpx.Client() as client:
-                res = client.post(f"{self.api_url}/order/placeorder", json=order, headers=headers)
-                res.raise_for_status()
-                data = res.json()
-                print(f"{side} order placed: {data}")
-                return True
+            static = self._order_static
+            if static is None or static["accountId"] != self.account_id:
+                static = self._order_static = {
+                    "accountSpec": self.username,
+                    "accountId": self.account_id,
+                    "symbol": self.symbol,
+                    "orderType": "Market",
+                    "isAutomated": True
+                }
+            order = {**static, "action": side, "orderQty": quantity}
+
+            # Whatever the outcome, the position may have changed
+            self._net_position = None
+            body = {"content": orjson.dumps(order)} if HAS_ORJSON else {"json": order}
+            res = self._request("POST", "/order/placeorder", headers={"Content-Type": "application/json"}, **body)
+            self._forget_account_id_if_stale(res)
+            res.raise_for_status()
+            data = _parse_json(res)
+            logger.info("%s order placed: %s", side, data)
+            return True
         except Exception as e:
-            print(f"Error placing order: {e}")
+            logger.error("Error placing order: %s", e)
             return False
 
     def get_current_position(self):
         """Get current position(s) for the account."""
         self.ensure_account_id()
-        access_token = self.token_manager.get_token()
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        with httpx.Client() as client:
-            res = client.get(f"{self.api_url}/position/list", headers=headers)
-            res.raise_for_status()
-            positions = res.json()
-            
-            # Filter positions by account_id
-            account_positions = [pos for pos in positions if pos.get("accountId") == self.account_id]
-            return account_positions
+        # Account-scoped endpoint: the server returns only this account's positions
+        res = self._request("GET", "/position/deps", params={"masterid": self.account_id})
+        self._forget_account_id_if_stale(res)
+        res.raise_for_status()
+        return _parse_json(res)
 
-    def get_net_position(self):
+    def get_net_position(self, fresh=False):
         """Get the net position (netPos) for the current symbol/account.
-        Returns 0 if no position exists."""
+        Returns 0 if no position exists. The value is cached until this trader sends an order
+        or it is older than NET_POSITION_MAX_AGE_SECONDS, so fills, stop-outs or manual changes
+        made on the broker side can be missed for that long. Pass fresh=True to always fetch it
+        (e.g. before deciding whether to send a closing order)."""
+        now = time.monotonic()
+        if not fresh and self._net_position is not None and now - self._net_position_time < NET_POSITION_MAX_AGE_SECONDS:
+            return self._net_position
         positions = self.get_current_position()
-        if not positions:
-            return 0
         # Return the netPos from the first position (or sum if multiple)
         # Typically there should be one position per account/symbol
-        return positions[0].get("netPos", 0)
+        net_position = positions[0].get("netPos", 0) if positions else 0
+        self._net_position = net_position
+        self._net_position_time = now
+        return net_position
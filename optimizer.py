@@ -1,100 +1,231 @@
-from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import islice, product
 import json
+import math
+from multiprocessing import shared_memory
 
 from strategy.strategy import Strategy
-from strategy.strategy_backtester import StrategyBacktester
+from strategy.strategy_backtester import StrategyBacktester, load_bars
+from lib.levels import get_static_levels
 
+import numpy as np
 import pandas as pd
 import os
 
 
 OPTIMIZE_LONG = False
+# Worker processes for the parameter sweep, one backtest per combination at a time
+MAX_WORKERS = os.cpu_count() or 1
 
-# Delete previous optimizer result if it exists
 output_file = "strategy/long_result/optimizer_result.csv" if OPTIMIZE_LONG else "strategy/short_result/optimizer_result.csv"
-if os.path.exists(output_file):
-    os.remove(output_file)
-    print(f"Deleted existing file: {output_file}")
-
-results = []
-# === Load Config ===
-with open("strategy/optimizer_config.json", "r") as f:
-    optimizer_config = json.load(f)
-    STATIC_LEVELS = optimizer_config.get("static_levels", [])
+# Result columns after the parameter columns (which follow param_grid's key order)
+METRIC_FIELDS = [
+    'TOTAL_PNL', 'WIN_RATE', 'AVERAGE_WINN', 'AVERAGE_LOSS', 'NUM_OF_TRADE', 'REWARD_TO_RISK',
+    'MAX_CONSECUTIVE_LOSE'
+]
+# Flush the result file every this many rows so progress is visible without a write per row
+FLUSH_EVERY = 50
+# Per-combination trade stats from the workers (OPTIMIZER_VERBOSE=1); otherwise only progress lines
+VERBOSE = bool(os.getenv("OPTIMIZER_VERBOSE"))
+PROGRESS_EVERY = 100
+# Chunks per worker handed to the pool at a time. executor.map submits its whole input up
+# front, so the grid is fed in batches to keep the pending work (and memory) bounded.
+SUBMIT_CHUNKS_PER_WORKER = 4
+# Screening: backtest every combination on the first SCREEN_FRACTION of the bars and only run
+# the full backtest for the best SCREEN_KEEP share by screening PnL (the final score's metric).
+# Off by default because pruned combinations are missing from the result file.
+SCREEN_COMBOS = False
+SCREEN_FRACTION = 0.1
+SCREEN_KEEP = 0.3
+
+# Backtest inputs shared by every combination, set once per worker process by _init_worker
+_worker_ctx = {}
+
+
+def _share_bars(data):
+    """
+    Copy the bar columns and timestamps into shared memory once for all workers.
+
+    Returns the blocks (the launcher unlinks them when done) and a (name, shape, dtype)
+    spec per array for _attach_bars.
+    """
+    arrays = {"timestamp": data.index.asi8, **{column: data[column].to_numpy() for column in data.columns}}
+    blocks, specs = [], {}
+    for key, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+        blocks.append(block)
+        specs[key] = (block.name, values.shape, values.dtype.str)
+    return blocks, specs
+
+
+def _attach_bars(specs):
+    """Rebuild the bar frame as read-only views over the shared blocks, without copying."""
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        values = np.ndarray(shape, dtype, buffer=block.buf)
+        values.flags.writeable = False
+        blocks.append(block)
+        arrays[key] = values
+    index = pd.DatetimeIndex(arrays.pop("timestamp").view("M8[ns]"))
+    return blocks, pd.DataFrame(arrays, index=index, copy=False)
+
+
+def _init_worker(param_names, bar_specs, screen_len, static_levels, long_dates, short_dates):
+    # Every worker maps the same bar arrays; the blocks are kept so the views stay valid
+    bar_blocks, data = _attach_bars(bar_specs)
+    # One backtester per data set, reused for every combination this worker runs
+    backtester = StrategyBacktester()
+    backtester.load_backtest_data(data)
+    screen_backtester = None
+    if screen_len:
+        screen_backtester = StrategyBacktester()
+        screen_backtester.load_backtest_data(data.iloc[:screen_len])
+    # param_grid keys (e.g. ENTRY_OFFSET) are the upper-case Strategy keyword arguments
+    strategy_kwargs = [name.lower() for name in param_names]
+    _worker_ctx.update(bar_blocks=bar_blocks, param_names=param_names, strategy_kwargs=strategy_kwargs, backtester=backtester,
+                       screen_backtester=screen_backtester, static_levels=static_levels,
+                       long_dates=long_dates, short_dates=short_dates)
+
+
+def _backtest(i, combo, backtester):
+    """Run one combination on backtester's data and return the finished strategy."""
+    strategy = Strategy(
+        name=f"Combo {i}",
+        trader=None,
+        **dict(zip(_worker_ctx["strategy_kwargs"], combo)),
+        long_dates=_worker_ctx["long_dates"],
+        short_dates=_worker_ctx["short_dates"],
+        symbol_size=50
+    )
+
+    strategy.load_static_levels(_worker_ctx["static_levels"])
+
+    backtester.reset_strategy(strategy)
+    backtester.run_backtest()
+    return strategy
+
+
+def _map_in_batches(executor, fn, tasks, chunksize):
+    """executor.map over tasks in order, submitting only a bounded batch of them at a time."""
+    tasks = iter(tasks)
+    batch_size = chunksize * MAX_WORKERS * SUBMIT_CHUNKS_PER_WORKER
+    while batch := list(islice(tasks, batch_size)):
+        yield from executor.map(fn, batch, chunksize=chunksize)
+
+
+def screen_one(task):
+    """Backtest a single (index, combination) pair on the screening slice and return its PnL."""
+    i, combo = task
+    return _backtest(i, combo, _worker_ctx["screen_backtester"]).total_pnl
+
+
+def run_one(task):
+    """Backtest a single (index, combination) pair and return its result row."""
+    i, combo = task
+    strategy = _backtest(i, combo, _worker_ctx["backtester"])
+
+    if VERBOSE:
+        strategy.print_trade_stats()
+    else:
+        strategy.compute_trade_stats()
+    return {
+        **dict(zip(_worker_ctx["param_names"], combo)),
+        'TOTAL_PNL': strategy.total_pnl,
+        'WIN_RATE': strategy.winrate,
+        "AVERAGE_WINN": strategy.avgWinner,
+        "AVERAGE_LOSS": strategy.avgLoser,
+        "NUM_OF_TRADE": strategy.total_trade,
+        "REWARD_TO_RISK": strategy.reward_to_risk,
+        "MAX_CONSECUTIVE_LOSE": strategy.max_losing_streak,
+    }
+
+
+if __name__ == "__main__":
+    # Delete previous optimizer result if it exists
+    if os.path.exists(output_file):
+        os.remove(output_file)
+        print(f"Deleted existing file: {output_file}")
+
+    # === Load Config ===
+    with open("strategy/optimizer_config.json", "r") as f:
+        optimizer_config = json.load(f)
+    # Shared level set unless the config overrides it; workers receive it once via the initializer
+    STATIC_LEVELS = optimizer_config.get("static_levels")
+    if STATIC_LEVELS is None:
+        STATIC_LEVELS = get_static_levels()
     param_grid = optimizer_config["param_grid"]
+    param_names = list(param_grid)
 
-    combinations = list(product(*param_grid.values()))
+    # Generated on demand and submitted in batches; only the screening pass holds the grid in memory
+    combinations = product(*param_grid.values())
+    num_combinations = math.prod(len(values) for values in param_grid.values())
 
     # Build long_dates
     long_date_ranges = optimizer_config.get("long_date_ranges", [])
-    long_dates = pd.DatetimeIndex([])
+    long_parts = []
     short_date_ranges = optimizer_config.get("short_date_ranges", [])
-    short_dates = pd.DatetimeIndex([])
+    short_parts = []
 
     if OPTIMIZE_LONG:
         for start_str, end_str in long_date_ranges:
             start = pd.to_datetime(start_str)
             end = pd.to_datetime(end_str)
-            long_dates = long_dates.union(pd.date_range(start=start, end=end, freq="1min"))
+            long_parts.append(pd.date_range(start=start, end=end, freq="1min").values)
     else:
         for start_str, end_str in short_date_ranges:
             start = pd.to_datetime(start_str)
             end = pd.to_datetime(end_str)
-            short_dates = short_dates.union(pd.date_range(start=start, end=end, freq="1min"))
-
-    csv_file = "data/es-1m-cleaned.csv"
-    data = pd.read_csv(csv_file, parse_dates=[0], index_col=0)
-
-    for i, combo in enumerate(combinations):
-        ENTRY_OFFSET, TAKE_PROFIT_OFFSET, STOP_LOSS_OFFSET, TRAIL_TRIGGER, RE_ENTRY_DISTANCE, MAX_OPEN_TRADES, MAX_CONTRACTS_PER_TRADE = combo
-        
-        strategy = Strategy(
-            name=f"Combo {i}",
-            trader=None,
-            entry_offset=ENTRY_OFFSET,
-            take_profit_offset=TAKE_PROFIT_OFFSET,
-            stop_loss_offset=STOP_LOSS_OFFSET,
-            trail_trigger=TRAIL_TRIGGER,
-            re_entry_distance=RE_ENTRY_DISTANCE,
-            max_open_trades=MAX_OPEN_TRADES,
-            max_contracts_per_trade=MAX_CONTRACTS_PER_TRADE,
-            long_dates=long_dates,
-            short_dates=short_dates,
-            symbol_size=50
-        )
-
-        strategy.load_static_levels(STATIC_LEVELS)
-        
-        backtester = StrategyBacktester()
-        backtester.load_strategy(strategy)
-        backtester.load_backtest_data(data)
-        backtester.run_backtest()
-
-        strategy.print_trade_stats()
-        result = {
-            'ENTRY_OFFSET': ENTRY_OFFSET,
-            'TAKE_PROFIT_OFFSET': TAKE_PROFIT_OFFSET,
-            'STOP_LOSS_OFFSET': STOP_LOSS_OFFSET,
-            'TRAIL_TRIGGER': TRAIL_TRIGGER,
-            'RE_ENTRY_DISTANCE': RE_ENTRY_DISTANCE,
-            'MAX_OPEN_TRADES': MAX_OPEN_TRADES,
-            'MAX_CONTRACTS_PER_TRADE': MAX_CONTRACTS_PER_TRADE,
-            'TOTAL_PNL': strategy.total_pnl,
-            'WIN_RATE': strategy.winrate,
-            "AVERAGE_WINN": strategy.avgWinner,
-            "AVERAGE_LOSS": strategy.avgLoser,
-            "NUM_OF_TRADE": strategy.total_trade,
-            "REWARD_TO_RISK": strategy.reward_to_risk,
-            "MAX_CONSECUTIVE_LOSE": strategy.max_losing_streak,
-        }
-
-        results.append(result)
-
-        # Write immediately to file
-        df = pd.DataFrame([result])
-        header = not os.path.exists(output_file)
-        df.to_csv(output_file, mode='a', index=False, header=header)
-
-    # Convert to DataFrame for analysis
-    results_df = pd.DataFrame(results)
-    print("Optimization result is available now!")
\ No newline at end of file
+            short_parts.append(pd.date_range(start=start, end=end, freq="1min").values)
+
+    # Concatenate once instead of re-sorting a growing index with union() per range
+    long_dates = pd.DatetimeIndex(np.unique(np.concatenate(long_parts))) if long_parts else pd.DatetimeIndex([])
+    short_dates = pd.DatetimeIndex(np.unique(np.concatenate(short_parts))) if short_parts else pd.DatetimeIndex([])
+
+    # Parsed once, then served from the Parquet cache on later runs
+    data = load_bars("data/es-1m-cleaned.csv")
+
+    # Combinations are independent backtests, so spread them over worker processes. The bars
+    # live in shared memory (one copy whatever the pool size), the other shared inputs go to
+    # each worker once through the initializer; tasks only carry (index, combo).
+    chunksize = max(1, num_combinations // (8 * MAX_WORKERS))
+    screen_len = int(len(data) * SCREEN_FRACTION) if SCREEN_COMBOS else 0
+    bar_blocks, bar_specs = _share_bars(data)
+    del data
+    try:
+        with open(output_file, "w", newline="") as result_file, \
+                ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                    initargs=(param_names, bar_specs, screen_len, STATIC_LEVELS, long_dates,
+                                              short_dates)) as executor:
+            tasks = enumerate(combinations)
+            num_tasks = num_combinations
+            if SCREEN_COMBOS:
+                tasks = list(tasks)
+                screen_pnl = np.fromiter(_map_in_batches(executor, screen_one, tasks, chunksize), dtype=np.float64,
+                                         count=len(tasks))
+                keep = max(1, math.ceil(len(tasks) * SCREEN_KEEP))
+                # Survivors keep their grid order so the result file stays ordered like a full run
+                survivors = np.sort(np.argsort(-screen_pnl, kind="stable")[:keep])
+                tasks = [tasks[n] for n in survivors]
+                num_tasks = len(tasks)
+                chunksize = max(1, num_tasks // (8 * MAX_WORKERS))
+                print(f"Screening kept {len(tasks)} of {num_combinations} combinations")
+
+            writer = csv.DictWriter(result_file, fieldnames=param_names + METRIC_FIELDS, lineterminator="\n")
+            writer.writeheader()
+            # map yields in combination order; only this process writes to the result file
+            for n, result in enumerate(_map_in_batches(executor, run_one, tasks, chunksize), 1):
+                writer.writerow(result)
+                if n % FLUSH_EVERY == 0:
+                    result_file.flush()
+                if n % PROGRESS_EVERY == 0:
+                    print(f"{n}/{num_tasks} combinations done")
+    finally:
+        for block in bar_blocks:
+            block.close()
+            block.unlink()
+
+    print("Optimization result is available now!")
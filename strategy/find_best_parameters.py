@@ -1,25 +1,39 @@
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow  # noqa: F401 - only needed for the Parquet copy of the results
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 OPTIMIZE_LONG = False
+# Only print the best rows: stream the input in chunks and skip writing the sorted outputs
+PREVIEW_ONLY = False
+TOP_K = 1
+CHUNK_SIZE = 100_000
+# Score weights (win rate, PnL, reward to risk, trade count), shared by both scoring paths
+WEIGHTS = (0.0, 1.0, 0.0, 0.0)
 # Load your CSV
 input_file = "long_result/optimizer_result.csv" if OPTIMIZE_LONG else "short_result/optimizer_result.csv"
 output_file = 'long_result/optimizer_final_result.csv' if OPTIMIZE_LONG else 'short_result/optimizer_final_result.csv'
-df = pd.read_csv(input_file) 
 
 def target_function(win_rate, total_pnl, reward_to_risk, num_of_trade,
-                    w_win=0, w_pnl=1, w_rr=0, w_trades=0):
-    # Normalize
-    win_rate_norm = min(win_rate / 100, 1.0)
+                    w_win=WEIGHTS[0], w_pnl=WEIGHTS[1], w_rr=WEIGHTS[2], w_trades=WEIGHTS[3]):
+    # Normalize (arguments are whole result columns as NumPy arrays)
+    win_rate_norm = np.minimum(win_rate / 100, 1.0)
     pnl_norm = total_pnl / 301475
-    rr_norm = min(reward_to_risk / 13.8, 1.0)
-    trades_norm = min(num_of_trade / 1000, 1.0)
+    rr_norm = np.minimum(reward_to_risk / 13.8, 1.0)
+    trades_norm = np.minimum(num_of_trade / 1000, 1.0)
 
     # Optional: apply penalty if too few trades
-    if num_of_trade < 30:
-        penalty = 0.5
-    else:
-        penalty = 1
+    penalty = np.where(num_of_trade < 30, 0.5, 1.0)
 
     # Weighted sum with penalty
     score = (w_win * win_rate_norm +
@@ -29,25 +43,62 @@ def target_function(win_rate, total_pnl, reward_to_risk, num_of_trade,
 
     return score
 
-# Compute final score
-df["SCORE"] = df.apply(
-    lambda row: target_function(
-        row["WIN_RATE"],
-        row["TOTAL_PNL"],
-        row["REWARD_TO_RISK"],
-        row["NUM_OF_TRADE"]
-    ),
-    axis=1
-)
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _score(win_rate, total_pnl, reward_to_risk, num_of_trade, w_win, w_pnl, w_rr, w_trades):
+        # Same formula as target_function, fused into one parallel pass with no temporary arrays
+        n = win_rate.shape[0]
+        out = np.empty(n, np.float64)
+        for i in prange(n):
+            penalty = 0.5 if num_of_trade[i] < 30 else 1.0
+            out[i] = (w_win * min(win_rate[i] / 100, 1.0) +
+                      w_pnl * (total_pnl[i] / 301475) +
+                      w_rr * min(reward_to_risk[i] / 13.8, 1.0) +
+                      w_trades * min(num_of_trade[i] / 1000, 1.0)) * penalty
+        return out
+
+def compute_scores(frame):
+    score_columns = (
+        frame["WIN_RATE"].to_numpy(dtype=np.float64),
+        frame["TOTAL_PNL"].to_numpy(dtype=np.float64),
+        frame["REWARD_TO_RISK"].to_numpy(dtype=np.float64),
+        frame["NUM_OF_TRADE"].to_numpy(dtype=np.float64)
+    )
+    if HAS_NUMBA:
+        return _score(*score_columns, *WEIGHTS)
+    return target_function(*score_columns, *WEIGHTS)
+
+if PREVIEW_ONLY:
+    # Keep a running top-K across chunks so memory stays bounded by CHUNK_SIZE
+    best = None
+    for chunk in pd.read_csv(input_file, chunksize=CHUNK_SIZE):
+        chunk["SCORE"] = compute_scores(chunk)
+        top = chunk.nlargest(TOP_K, 'SCORE')
+        best = top if best is None else pd.concat([best, top]).nlargest(TOP_K, 'SCORE')
+else:
+    df = pd.read_csv(input_file)
+
+    # Compute final score
+    df["SCORE"] = compute_scores(df)
+
+    # # Sort by Score descending
+    df_sorted = df.sort_values(by='SCORE', ascending=False)
 
-# # Sort by Score descending
-df_sorted = df.sort_values(by='SCORE', ascending=False)
+    # Output to a new CSV
+    df_sorted.to_csv(output_file, index=False)
 
-# Output to a new CSV
-df_sorted.to_csv(output_file, index=False)
+    # Typed columnar copy so downstream tools can read just the columns they need
+    if HAS_PYARROW:
+        df_sorted.to_parquet(output_file.replace('.csv', '.parquet'), index=False, compression='zstd')
 
-# Find the best parameter set
-best_row = df_sorted.loc[df_sorted['SCORE'].idxmax()]
+    # Find the best parameter set (heap selection, no second pass over the sorted frame)
+    best = df.nlargest(1, 'SCORE')
 
-print("Best Parameter Set:")
-print(best_row)
+if best is None or best.empty:
+    print(f"No results in {input_file}")
+elif len(best) == 1:
+    print("Best Parameter Set:")
+    print(best.iloc[0])
+else:
+    print(f"Top {len(best)} Parameter Sets:")
+    print(best.to_string(index=False))
@@ -2,10 +2,12 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Set
 from matplotlib import pyplot as plt
 import logging
+import numpy as np
+import pandas as pd
 
 from lib.tradovate_api import TradovateTrader
 from lib.state_persistence import StatePersistence
-from lib.cme_trading_hours import CMETradingHours
+from lib.cme_trading_hours import CMETradingHours, STATUS_OPEN, STATUS_FLATTEN
 
 # Get strategy logger - only logger used
 strategy_logger = logging.getLogger('strategy')
@@ -35,6 +37,9 @@ class Strategy:
         self.name = name
         self.trader = trader
         self.static_levels = None
+        # Sorted float64 copy of static_levels for binary search, and level -> index of first occurrence
+        self._static_levels_arr = np.empty(0, dtype=np.float64)
+        self._level_to_idx: Dict[float, int] = {}
         self.entry_offset = entry_offset / 4 # convert from ticks to price 
         self.take_profit_offset = take_profit_offset / 4 # convert from ticks to price
         self.stop_loss_offset = stop_loss_offset / 4  # convert from ticks to price
@@ -92,11 +97,45 @@ class Strategy:
         self._last_bar_index: Optional[datetime] = None  # Track current bar timestamp
         self._last_entry_time: Optional[datetime] = None  # Track last entry time
         self.MIN_ENTRY_INTERVAL_MINUTES = 5  # Minimum minutes between entries
+        # Slack added around searched price ranges so float rounding can't drop a candidate level
+        self.LEVEL_SEARCH_MARGIN = 1.0
 
-    def load_static_levels(self, static_levels: List[int]):
+    def load_static_levels(self, static_levels: List[float]):
+        """
+        Load the static price levels (a list or a read-only NumPy array).
+
+        :param static_levels: Price levels; stored sorted
+        """
+        if isinstance(static_levels, np.ndarray):
+            static_levels = static_levels.tolist()
         self.static_levels = sorted(static_levels)
+        self._index_static_levels()
         # Store direction of level cross: 'up', 'down', or None
         self.retrace_levels = {i: None for i in range(len(static_levels))}
+
+    def _index_static_levels(self):
+        """Build the lookup structures used to find the static levels near the current price."""
+        levels = self.static_levels or []
+        self._static_levels_arr = np.asarray(levels, dtype=np.float64)
+        self._level_to_idx = {}
+        for idx, level in enumerate(levels):
+            self._level_to_idx.setdefault(level, idx)
+
+    def _levels_between(self, low: float, high: float) -> range:
+        """
+        Positions of the static levels inside [low, high], in ascending order.
+
+        The bounds are widened by LEVEL_SEARCH_MARGIN so callers can pass approximate
+        bounds and still apply their exact conditions to every level that can match.
+
+        :param low: Lower price bound
+        :param high: Upper price bound
+        :return: range of positions into self.static_levels
+        """
+        arr = self._static_levels_arr
+        start = int(np.searchsorted(arr, low - self.LEVEL_SEARCH_MARGIN, side='left'))
+        stop = int(np.searchsorted(arr, high + self.LEVEL_SEARCH_MARGIN, side='right'))
+        return range(start, stop)
     
     def get_state(self) -> dict:
         """
@@ -243,6 +282,7 @@ class Strategy:
         # but can restore from state if needed
         if state.get('static_levels') and not self.static_levels:
             self.static_levels = state['static_levels']
+            self._index_static_levels()
 
         # Restore entry rate limiting state
         last_entry_time = state.get('last_entry_time')
@@ -320,41 +360,59 @@ class Strategy:
             self._entries_this_bar = set()
             self._last_bar_index = self.index
 
-        max_open_trades = self.calculate_max_open_trades(self.price)
+        # Fixed for the whole call; bound once instead of re-read per level and per contract
+        price = self.price
+        last_price = self.last_price
+        static_levels = self.static_levels
+        level_to_idx = self._level_to_idx
+        retrace_levels = self.retrace_levels
+        re_entry_distance = self.re_entry_distance
+        stop_loss_offset = self.stop_loss_offset
+        take_profit_offset = self.take_profit_offset
+        max_open_trades = self.calculate_max_open_trades(price)
         level_crossed = False
+        # Checked once per call so the per-level diagnostics below skip f-string formatting when filtered out
+        log_info = strategy_logger.isEnabledFor(logging.INFO)
 
         # ALWAYS track level crosses regardless of whether we can trade
-        for level in self.static_levels:
-            level_idx = self.static_levels.index(level)
+        # (a level can only be crossed if it lies between the bar's extremes and the current price)
+        for pos in self._levels_between(min(price, self.low_price), max(price, self.high_price)):
+            level = static_levels[pos]
+            level_idx = level_to_idx[level]
             
             # Track direction of level cross
-            if self.price <= level < self.high_price:  # Price crossed DOWN through level
+            if price <= level < self.high_price:  # Price crossed DOWN through level
                 level_crossed = True
-                strategy_logger.info(f"{self.name}: Price crossed DOWN through level {level} (level_idx={level_idx})")
-                strategy_logger.info(f"  Current price: {self.price}, High: {self.high_price}, Level: {level}")
-                self.retrace_levels[level_idx] = 'down'
-            elif self.price >= level > self.low_price:  # Price crossed UP through level
+                if log_info:
+                    strategy_logger.info(f"{self.name}: Price crossed DOWN through level {level} (level_idx={level_idx})")
+                    strategy_logger.info(f"  Current price: {self.price}, High: {self.high_price}, Level: {level}")
+                retrace_levels[level_idx] = 'down'
+            elif price >= level > self.low_price:  # Price crossed UP through level
                 level_crossed = True
-                strategy_logger.info(f"{self.name}: Price crossed UP through level {level} (level_idx={level_idx})")
-                strategy_logger.info(f"  Current price: {self.price}, Low: {self.low_price}, Level: {level}")
-                self.retrace_levels[level_idx] = 'up'
+                if log_info:
+                    strategy_logger.info(f"{self.name}: Price crossed UP through level {level} (level_idx={level_idx})")
+                    strategy_logger.info(f"  Current price: {self.price}, Low: {self.low_price}, Level: {level}")
+                retrace_levels[level_idx] = 'up'
         
         # Only check entry conditions if we have room to trade
         if max_open_trades > 0:  # can trade
-            for level in self.static_levels:
-                entry_offset = self.entry_offset
-                level_idx = self.static_levels.index(level)
+            entry_offset = self.entry_offset
+            # Levels whose entry zone the price can have crossed, plus those close enough to be logged
+            for pos in self._levels_between(min(price - entry_offset, price - 50),
+                                            max(last_price - entry_offset, price + 50)):
+                level = static_levels[pos]
+                level_idx = level_to_idx[level]
 
                 # For long strategy, enter when price crosses up after a down retrace
-                re_entry_idx = level_idx + self.re_entry_distance
+                re_entry_idx = level_idx + re_entry_distance
                 
                 # Check entry conditions
-                condition1 = self.price <= level + entry_offset < self.last_price
-                condition2 = re_entry_idx in self.retrace_levels
-                condition3 = self.retrace_levels.get(re_entry_idx) == 'down' if condition2 else False
+                condition1 = price <= level + entry_offset < last_price
+                condition2 = re_entry_idx in retrace_levels
+                condition3 = retrace_levels.get(re_entry_idx) == 'down' if condition2 else False
                 
                 # Log detailed decision process when price crosses this level or nearby
-                if abs(self.price - level) < 50:  # Near this level
+                if log_info and abs(price - level) < 50:  # Near this level
                     if condition1 or level_crossed:  # Price action happening
                         strategy_logger.info(f"{self.name}: Evaluating LONG entry at level {level}")
                         strategy_logger.info(f"  Step 1 - Price crossed down through entry zone?")
@@ -377,55 +435,63 @@ class Strategy:
                 if condition1 and condition2 and condition3:
                     # Check if this level was already entered this bar
                     if level_idx in self._entries_this_bar:
-                        strategy_logger.info(f"{self.name}: Skipping entry at level {level} - already entered this bar")
+                        if log_info:
+                            strategy_logger.info(f"{self.name}: Skipping entry at level {level} - already entered this bar")
                         continue
 
                     # Check minimum time between entries
                     if self._last_entry_time is not None:
                         time_since_last = self.index - self._last_entry_time
                         if time_since_last < timedelta(minutes=self.MIN_ENTRY_INTERVAL_MINUTES):
-                            strategy_logger.info(f"{self.name}: Skipping entry at level {level} - only {time_since_last} since last entry (min: {self.MIN_ENTRY_INTERVAL_MINUTES} min)")
+                            if log_info:
+                                strategy_logger.info(f"{self.name}: Skipping entry at level {level} - only {time_since_last} since last entry (min: {self.MIN_ENTRY_INTERVAL_MINUTES} min)")
                             continue
 
-                    strategy_logger.info(f"{self.name}: *** ENTRY TRIGGERED *** at level {level} (level_idx={level_idx}, re_entry_idx={re_entry_idx})")
-                    strategy_logger.info(f"  - Price: {self.price}, Last: {self.last_price}, Entry threshold: {level + entry_offset}")
-                    strategy_logger.info(f"  - Retrace level {re_entry_idx} direction: {self.retrace_levels[re_entry_idx]}")
-                    self.retrace_levels[re_entry_idx] = None  # Clear the retrace flag
+                    if log_info:
+                        strategy_logger.info(f"{self.name}: *** ENTRY TRIGGERED *** at level {level} (level_idx={level_idx}, re_entry_idx={re_entry_idx})")
+                        strategy_logger.info(f"  - Price: {self.price}, Last: {self.last_price}, Entry threshold: {level + entry_offset}")
+                        strategy_logger.info(f"  - Retrace level {re_entry_idx} direction: {self.retrace_levels[re_entry_idx]}")
+                    retrace_levels[re_entry_idx] = None  # Clear the retrace flag
                     # Now the entry condition met. We can enter trade here.
-                    for _ in range(self.max_contracts_per_trade):  # number of contracts to trade
-                        entry_price = self.price
-                        stop_level = entry_price - self.stop_loss_offset
-                        trailing_stop = None
-                        take_profit_level = entry_price + self.take_profit_offset
-                        trade = [self.index, entry_price, stop_level, trailing_stop, level, take_profit_level]
-
-                        strategy_logger.info(f"{self.name}: [{self.index}] BUY ORDER SENT at {entry_price} (Retraced to static level {level})")
+                    # All contracts share one entry, so send a single order for the full size
+                    contracts = self.max_contracts_per_trade  # number of contracts to trade
+                    entry_price = price
+                    stop_level = entry_price - stop_loss_offset
+                    trailing_stop = None
+                    take_profit_level = entry_price + take_profit_offset
+
+                    if log_info:
+                        strategy_logger.info(f"{self.name}: [{self.index}] BUY ORDER SENT for {contracts} contract(s) at {entry_price} (Retraced to static level {level})")
                         strategy_logger.info(f"{self.name}: Stop-Loss Level: {stop_level}")
 
-                        order_success = False
-                        if self.trader is not None:
-                            order_success = self.trader.enter_position(quantity=1, is_long=True)
-                        else:
-                            # If no trader, assume success for backtesting
-                            order_success = True
-
-                        if order_success:
-                            self.position = 'long'
-                            self.trade_history.append((self.index, 'BUY', entry_price, 0))  # pnl for buy trade is $0 since we haven't locked in any pnl yet
-                            self.open_trade_list.append(trade)
-                            self.open_trade_count += 1
-                            self.current_cash_value -= entry_price * 0.1 * 4 * 12.5
-                            max_open_trades -= 1
-                            # Track this entry
-                            self._entries_this_bar.add(level_idx)
-                            self._last_entry_time = self.index
+                    order_success = False
+                    if self.trader is not None:
+                        order_success = self.trader.enter_position(quantity=contracts, is_long=True)
+                    else:
+                        # If no trader, assume success for backtesting
+                        order_success = True
+
+                    if order_success:
+                        self.position = 'long'
+                        # Still one record per contract: exits, PnL and trade stats are tracked per contract
+                        self.trade_history.extend([(self.index, 'BUY', entry_price, 0)] * contracts)  # pnl for buy trade is $0 since we haven't locked in any pnl yet
+                        self.open_trade_list.extend([self.index, entry_price, stop_level, trailing_stop, level, take_profit_level]
+                                                    for _ in range(contracts))
+                        self.open_trade_count += contracts
+                        self.current_cash_value -= contracts * entry_price * 0.1 * 4 * 12.5
+                        max_open_trades -= contracts
+                        # Track this entry
+                        self._entries_this_bar.add(level_idx)
+                        self._last_entry_time = self.index
+                        if log_info:
                             strategy_logger.info(f"{self.name}: ✓ Order executed successfully. Open trades: {self.open_trade_count} (list size: {len(self.open_trade_list)})")
-                        else:
-                            strategy_logger.warning(f"{self.name}: ✗ Order FAILED. Trade not added to list.")
+                    else:
+                        strategy_logger.warning(f"{self.name}: ✗ Order FAILED. Trade not added to list.")
 
         else:
             if self.open_trade_count >= self.max_open_trades:
-                strategy_logger.info(f"{self.name}: No room to trade (Open: {self.open_trade_count}/{self.max_open_trades})")
+                if log_info:
+                    strategy_logger.info(f"{self.name}: No room to trade (Open: {self.open_trade_count}/{self.max_open_trades})")
         
     def run_sell_strategy(self):
         # need valid data
@@ -435,41 +501,59 @@ class Strategy:
             self._entries_this_bar = set()
             self._last_bar_index = self.index
 
-        max_open_trades = self.calculate_max_open_trades(self.price)
+        # Fixed for the whole call; bound once instead of re-read per level and per contract
+        price = self.price
+        last_price = self.last_price
+        static_levels = self.static_levels
+        level_to_idx = self._level_to_idx
+        retrace_levels = self.retrace_levels
+        re_entry_distance = self.re_entry_distance
+        stop_loss_offset = self.stop_loss_offset
+        take_profit_offset = self.take_profit_offset
+        max_open_trades = self.calculate_max_open_trades(price)
         level_crossed = False
+        # Checked once per call so the per-level diagnostics below skip f-string formatting when filtered out
+        log_info = strategy_logger.isEnabledFor(logging.INFO)
 
         # ALWAYS track level crosses regardless of whether we can trade
-        for level in self.static_levels:
-            level_idx = self.static_levels.index(level)
+        # (a level can only be crossed if it lies between the bar's extremes and the current price)
+        for pos in self._levels_between(min(price, self.low_price), max(price, self.high_price)):
+            level = static_levels[pos]
+            level_idx = level_to_idx[level]
             
             # Track direction of level cross
-            if self.price >= level > self.low_price:  # Price crossed UP through level
+            if price >= level > self.low_price:  # Price crossed UP through level
                 level_crossed = True
-                strategy_logger.info(f"{self.name}: Price crossed UP through level {level} (level_idx={level_idx})")
-                strategy_logger.info(f"  Current price: {self.price}, Low: {self.low_price}, Level: {level}")
-                self.retrace_levels[level_idx] = 'up'
-            elif self.price <= level < self.high_price:  # Price crossed DOWN through level
+                if log_info:
+                    strategy_logger.info(f"{self.name}: Price crossed UP through level {level} (level_idx={level_idx})")
+                    strategy_logger.info(f"  Current price: {self.price}, Low: {self.low_price}, Level: {level}")
+                retrace_levels[level_idx] = 'up'
+            elif price <= level < self.high_price:  # Price crossed DOWN through level
                 level_crossed = True
-                strategy_logger.info(f"{self.name}: Price crossed DOWN through level {level} (level_idx={level_idx})")
-                strategy_logger.info(f"  Current price: {self.price}, High: {self.high_price}, Level: {level}")
-                self.retrace_levels[level_idx] = 'down'
+                if log_info:
+                    strategy_logger.info(f"{self.name}: Price crossed DOWN through level {level} (level_idx={level_idx})")
+                    strategy_logger.info(f"  Current price: {self.price}, High: {self.high_price}, Level: {level}")
+                retrace_levels[level_idx] = 'down'
         
         # Only check entry conditions if we have room to trade
         if max_open_trades > 0:  # can trade
-            for level in self.static_levels:
-                entry_offset = self.entry_offset
-                level_idx = self.static_levels.index(level)
+            entry_offset = self.entry_offset
+            # Levels whose entry zone the price can have crossed, plus those close enough to be logged
+            for pos in self._levels_between(min(last_price + entry_offset, price - 50),
+                                            max(price + entry_offset, price + 50)):
+                level = static_levels[pos]
+                level_idx = level_to_idx[level]
                 
                 # For short strategy, enter when price crosses down after an up retrace
-                re_entry_idx = level_idx - self.re_entry_distance
+                re_entry_idx = level_idx - re_entry_distance
                 
                 # Check entry conditions
-                condition1 = self.price > level - entry_offset >= self.last_price
-                condition2 = re_entry_idx in self.retrace_levels
-                condition3 = self.retrace_levels.get(re_entry_idx) == 'up' if condition2 else False
+                condition1 = price > level - entry_offset >= last_price
+                condition2 = re_entry_idx in retrace_levels
+                condition3 = retrace_levels.get(re_entry_idx) == 'up' if condition2 else False
                 
                 # Log detailed decision process when price crosses this level or nearby
-                if abs(self.price - level) < 50:  # Near this level
+                if log_info and abs(price - level) < 50:  # Near this level
                     if condition1 or level_crossed:  # Price action happening
                         strategy_logger.info(f"{self.name}: Evaluating SHORT entry at level {level}")
                         strategy_logger.info(f"  Step 1 - Price crossed up through entry zone?")
@@ -492,56 +576,64 @@ class Strategy:
                 if condition1 and condition2 and condition3:
                     # Check if this level was already entered this bar
                     if level_idx in self._entries_this_bar:
-                        strategy_logger.info(f"{self.name}: Skipping entry at level {level} - already entered this bar")
+                        if log_info:
+                            strategy_logger.info(f"{self.name}: Skipping entry at level {level} - already entered this bar")
                         continue
 
                     # Check minimum time between entries
                     if self._last_entry_time is not None:
                         time_since_last = self.index - self._last_entry_time
                         if time_since_last < timedelta(minutes=self.MIN_ENTRY_INTERVAL_MINUTES):
-                            strategy_logger.info(f"{self.name}: Skipping entry at level {level} - only {time_since_last} since last entry (min: {self.MIN_ENTRY_INTERVAL_MINUTES} min)")
+                            if log_info:
+                                strategy_logger.info(f"{self.name}: Skipping entry at level {level} - only {time_since_last} since last entry (min: {self.MIN_ENTRY_INTERVAL_MINUTES} min)")
                             continue
 
-                    strategy_logger.info(f"{self.name}: *** ENTRY TRIGGERED *** at level {level} (level_idx={level_idx}, re_entry_idx={re_entry_idx})")
-                    strategy_logger.info(f"  - Price: {self.price}, Last: {self.last_price}, Entry threshold: {level - entry_offset}")
-                    strategy_logger.info(f"  - Retrace level {re_entry_idx} direction: {self.retrace_levels[re_entry_idx]}")
-                    self.retrace_levels[re_entry_idx] = None  # Clear the retrace flag
+                    if log_info:
+                        strategy_logger.info(f"{self.name}: *** ENTRY TRIGGERED *** at level {level} (level_idx={level_idx}, re_entry_idx={re_entry_idx})")
+                        strategy_logger.info(f"  - Price: {self.price}, Last: {self.last_price}, Entry threshold: {level - entry_offset}")
+                        strategy_logger.info(f"  - Retrace level {re_entry_idx} direction: {self.retrace_levels[re_entry_idx]}")
+                    retrace_levels[re_entry_idx] = None  # Clear the retrace flag
 
                     # We can enter trade here.
-                    for _ in range(self.max_contracts_per_trade):  # number of contracts to trade
-                        entry_price = self.price
-                        stop_level = self.price + self.stop_loss_offset
-                        trailing_stop = None
-                        take_profit_level = entry_price - self.take_profit_offset
-                        trade = [self.index, entry_price, stop_level, trailing_stop, level, take_profit_level]
-
-                        strategy_logger.info(f"{self.name}: [{self.index}] SELL ORDER SENT at {entry_price} (Retraced up to static level {level})")
+                    # All contracts share one entry, so send a single order for the full size
+                    contracts = self.max_contracts_per_trade  # number of contracts to trade
+                    entry_price = price
+                    stop_level = price + stop_loss_offset
+                    trailing_stop = None
+                    take_profit_level = entry_price - take_profit_offset
+
+                    if log_info:
+                        strategy_logger.info(f"{self.name}: [{self.index}] SELL ORDER SENT for {contracts} contract(s) at {entry_price} (Retraced up to static level {level})")
                         strategy_logger.info(f"{self.name}: Stop-Loss Level: {stop_level}")
 
-                        order_success = False
-                        if self.trader is not None:
-                            order_success = self.trader.enter_position(quantity=1, is_long=False)
-                        else:
-                            # If no trader, assume success for backtesting
-                            order_success = True
-
-                        if order_success:
-                            self.position = 'short'
-                            self.trade_history.append((self.index, 'SELL', entry_price, 0))
-                            self.open_trade_list.append(trade)
-                            self.open_trade_count += 1
-                            self.current_cash_value -= entry_price * 0.1 * 4 * 12.5
-                            max_open_trades -= 1
-                            # Track this entry
-                            self._entries_this_bar.add(level_idx)
-                            self._last_entry_time = self.index
+                    order_success = False
+                    if self.trader is not None:
+                        order_success = self.trader.enter_position(quantity=contracts, is_long=False)
+                    else:
+                        # If no trader, assume success for backtesting
+                        order_success = True
+
+                    if order_success:
+                        self.position = 'short'
+                        # Still one record per contract: exits, PnL and trade stats are tracked per contract
+                        self.trade_history.extend([(self.index, 'SELL', entry_price, 0)] * contracts)
+                        self.open_trade_list.extend([self.index, entry_price, stop_level, trailing_stop, level, take_profit_level]
+                                                    for _ in range(contracts))
+                        self.open_trade_count += contracts
+                        self.current_cash_value -= contracts * entry_price * 0.1 * 4 * 12.5
+                        max_open_trades -= contracts
+                        # Track this entry
+                        self._entries_this_bar.add(level_idx)
+                        self._last_entry_time = self.index
+                        if log_info:
                             strategy_logger.info(f"{self.name}: ✓ Order executed successfully. Open trades: {self.open_trade_count} (list size: {len(self.open_trade_list)})")
-                        else:
-                            strategy_logger.warning(f"{self.name}: ✗ Order FAILED. Trade not added to list.")
+                    else:
+                        strategy_logger.warning(f"{self.name}: ✗ Order FAILED. Trade not added to list.")
 
         else:
             if self.open_trade_count >= self.max_open_trades:
-                strategy_logger.info(f"{self.name}: No room to trade (Open: {self.open_trade_count}/{self.max_open_trades})")
+                if log_info:
+                    strategy_logger.info(f"{self.name}: No room to trade (Open: {self.open_trade_count}/{self.max_open_trades})")
 
     def flatten_all_positions(self, reason: str = "Market close"):
         """
@@ -594,9 +686,18 @@ class Strategy:
 
     def check_trade_to_remove(self):
        if self.open_trade_count > 0:
-            trades_to_remove = []
-            for i in range(len(self.open_trade_list)):
-                trade_time, entry_price, stop_level, trailing_stop, traded_level, take_profit_level  = self.open_trade_list[i]
+            closed_indices = set()
+            # Same for every open trade on this tick; read once instead of per trade
+            price = self.price
+            static_levels = self.static_levels
+            level_to_idx = self._level_to_idx
+            trail_trigger = self.trail_trigger
+            stop_loss_offset = self.stop_loss_offset
+            symbol_size = self.symbol_size
+            # Checked once per call so the per-trade messages below skip formatting when filtered out
+            log_info = strategy_logger.isEnabledFor(logging.INFO)
+            for i, trade in enumerate(self.open_trade_list):
+                trade_time, entry_price, stop_level, trailing_stop, traded_level, take_profit_level = trade
                 
                 # Ensure trade_time is a datetime object (convert from string if needed)
                 if not isinstance(trade_time, datetime):
@@ -606,99 +707,109 @@ class Strategy:
                         strategy_logger.warning(f"Could not parse trade_time for trade {i}, skipping")
                         continue
                     # Update the list with the parsed datetime
-                    self.open_trade_list[i][0] = trade_time
+                    trade[0] = trade_time
                 
                 is_long_trade = entry_price < take_profit_level
 
                 if is_long_trade:
                     if trailing_stop is None:
                         # Check if price has moved 2 levels above entry
-                        index_of_level = self.static_levels.index(traded_level)  # find the level we triggered on
-                        if len(self.static_levels) - 2 < index_of_level:  # we have no more levels to check so have to invalidate this trade #TODO: something smarter?
+                        index_of_level = level_to_idx[traded_level]  # find the level we triggered on
+                        if len(static_levels) - 2 < index_of_level:  # we have no more levels to check so have to invalidate this trade #TODO: something smarter?
                             # del trade_history[-1]  # remove trade since we have no way to trigger a stop
                             raise ("ERROR ")  # hopefully this never happens but if it does, break until we fix this
 
 
-                        trigger_price = self.static_levels[index_of_level + self.trail_trigger]  # find the price 2 levels up
-                        if self.price > trigger_price:
-                            strategy_logger.info(f"{self.name}: Trailing stop activated for LONG at {trigger_price}")
+                        trigger_price = static_levels[index_of_level + trail_trigger]  # find the price 2 levels up
+                        if price > trigger_price:
+                            if log_info:
+                                strategy_logger.info(f"{self.name}: Trailing stop activated for LONG at {trigger_price}")
                             trailing_stop = trigger_price
-                            self.open_trade_list[i][3] = trailing_stop  # update our trailing stop
+                            trade[3] = trailing_stop  # update our trailing stop
 
                     if trailing_stop is not None:
-                        trailing_stop = max(trailing_stop, self.price - self.stop_loss_offset)  # use high
-                        self.open_trade_list[i][3] = trailing_stop  # update trailing stop
+                        trailing_stop = max(trailing_stop, price - stop_loss_offset)  # use high
+                        trade[3] = trailing_stop  # update trailing stop
 
-                    if self.price <= stop_level or (trailing_stop is not None and self.price <= trailing_stop) or (self.price >= take_profit_level):
+                    if price <= stop_level or (trailing_stop is not None and price <= trailing_stop) or (price >= take_profit_level):
                         # trade_history.append((index, 'SELL', price))
 
-                        pnl = (self.price - entry_price) * self.symbol_size  # mult be size
+                        pnl = (price - entry_price) * symbol_size  # mult be size
                         self.current_cash_value += pnl
                         # add tied up margin to the current cash
                         self.current_cash_value += entry_price * 0.1 * 4 * 12.5
                         self.total_pnl += pnl
-                        self.trade_history.append((self.index, 'EXIT', self.price, pnl))
+                        self.trade_history.append((self.index, 'EXIT', price, pnl))
                         self.cumulative_pnl.append(self.total_pnl)
 
                         # clean up open trades
                         self.open_trade_count -= 1
-                        trades_to_remove.append([trade_time, entry_price, stop_level, trailing_stop, traded_level, take_profit_level])
+                        closed_indices.add(i)
                         if self.trader is not None:
-                            netPosition = self.trader.get_net_position()
+                            netPosition = self.trader.get_net_position(fresh=True)  # broker-side fills can't hide behind the cache
                             if netPosition > 0:
                                 self.trader.enter_position(quantity=1, is_long=False)
 
-                        reason = "Trailing stop" if trailing_stop and self.price <= trailing_stop else ("Stop loss" if self.price <= stop_level else "Take profit")
-                        strategy_logger.info(f"{self.name}: LONG EXIT - {reason} at {self.price} | PnL: ${pnl:.2f} | Entry: {entry_price} | Duration: {self._calculate_duration(trade_time, self.index)}")
-                        strategy_logger.info(f"{self.name}: Open trade count decreased to {self.open_trade_count}")
+                        if log_info:
+                            reason = "Trailing stop" if trailing_stop and price <= trailing_stop else ("Stop loss" if price <= stop_level else "Take profit")
+                            strategy_logger.info(f"{self.name}: LONG EXIT - {reason} at {price} | PnL: ${pnl:.2f} | Entry: {entry_price} | Duration: {self._calculate_duration(trade_time, self.index)}")
+                            strategy_logger.info(f"{self.name}: Open trade count decreased to {self.open_trade_count}")
 
                 else:
                     if trailing_stop is None:
-                        index_of_level = self.static_levels.index(traded_level)
-                        if index_of_level < self.trail_trigger:
+                        index_of_level = level_to_idx[traded_level]
+                        if index_of_level < trail_trigger:
                             raise ("ERROR")  # Not enough lower levels to use as trigger
 
-                        trigger_price = self.static_levels[index_of_level - self.trail_trigger]
-                        if self.price <= trigger_price:
-                            strategy_logger.info(f"{self.name}: Trailing stop activated for SHORT at {trigger_price}")
+                        trigger_price = static_levels[index_of_level - trail_trigger]
+                        if price <= trigger_price:
+                            if log_info:
+                                strategy_logger.info(f"{self.name}: Trailing stop activated for SHORT at {trigger_price}")
                             trailing_stop = trigger_price
-                            self.open_trade_list[i][3] = trailing_stop
+                            trade[3] = trailing_stop
 
                     if trailing_stop is not None:
                         # take the lowest static level above the low of the day
                         # lowest_static_level = sorted([x for x in self.static_levels if x > self.low_price])[0]
-                        trailing_stop = min(trailing_stop, self.price + self.stop_loss_offset)
-                        self.open_trade_list[i][3] = trailing_stop
+                        trailing_stop = min(trailing_stop, price + stop_loss_offset)
+                        trade[3] = trailing_stop
 
-                    if self.price >= stop_level or (trailing_stop is not None and self.price >= trailing_stop) or (self.price <= take_profit_level):
-                        pnl = (entry_price - self.price) * self.symbol_size
+                    if price >= stop_level or (trailing_stop is not None and price >= trailing_stop) or (price <= take_profit_level):
+                        pnl = (entry_price - price) * symbol_size
                         self.current_cash_value += pnl
                         self.current_cash_value += entry_price * 0.1 * 4 * 12.5
                         self.total_pnl += pnl
-                        self.trade_history.append((self.index, 'EXIT', self.price, pnl))
+                        self.trade_history.append((self.index, 'EXIT', price, pnl))
                         self.cumulative_pnl.append(self.total_pnl)
 
                         self.open_trade_count -= 1
-                        trades_to_remove.append([trade_time, entry_price, stop_level, trailing_stop, traded_level, take_profit_level])
+                        closed_indices.add(i)
                         
                         if self.trader is not None:
-                            netPosition = self.trader.get_net_position()
+                            netPosition = self.trader.get_net_position(fresh=True)  # broker-side fills can't hide behind the cache
                             if netPosition < 0:
                                 self.trader.enter_position(quantity=1, is_long=True)
                         
-                        reason = "Trailing stop" if trailing_stop and self.price >= trailing_stop else ("Stop loss" if self.price >= stop_level else "Take profit")
-                        strategy_logger.info(f"{self.name}: SHORT EXIT - {reason} at {self.price} | PnL: ${pnl:.2f} | Entry: {entry_price} | Duration: {self._calculate_duration(trade_time, self.index)}")
-                        strategy_logger.info(f"{self.name}: Open trade count decreased to {self.open_trade_count}")
-
-            for trade in trades_to_remove:
-                del self.open_trade_list[self.open_trade_list.index(trade)]  # remove the open trade
+                        if log_info:
+                            reason = "Trailing stop" if trailing_stop and price >= trailing_stop else ("Stop loss" if price >= stop_level else "Take profit")
+                            strategy_logger.info(f"{self.name}: SHORT EXIT - {reason} at {price} | PnL: ${pnl:.2f} | Entry: {entry_price} | Duration: {self._calculate_duration(trade_time, self.index)}")
+                            strategy_logger.info(f"{self.name}: Open trade count decreased to {self.open_trade_count}")
+
+            if closed_indices:
+                # remove the closed trades in one pass
+                self.open_trade_list = [trade for i, trade in enumerate(self.open_trade_list) if i not in closed_indices]
             
             # Validate open_trade_count matches open_trade_list length
             if self.open_trade_count != len(self.open_trade_list):
                 strategy_logger.warning(f"{self.name}: MISMATCH! open_trade_count={self.open_trade_count} but open_trade_list has {len(self.open_trade_list)} items. Fixing...")
                 self.open_trade_count = len(self.open_trade_list)
 
-    def update(self, index: datetime, price: float, last_price: float, high_price: float, low_price: float):
+    def update(self, index: datetime, price: float, last_price: float, high_price: float, low_price: float,
+               trading_status: Optional[int] = None):
+        """
+        :param trading_status: Precomputed CME trading status for this bar (see CMETradingHours.classify_index).
+                               When None it is looked up from index.
+        """
         # check prices are valid
         if None in [price, last_price, high_price]:
             raise ValueError(f"Invalid data -> {price}, {last_price}, {high_price}")
@@ -717,8 +828,13 @@ class Strategy:
                 if self._last_flatten_date != current_date:
                     self._positions_flattened_today = False
 
+                if trading_status is None:
+                    trading_status = self.trading_hours.classify(index)
+                should_flatten = trading_status == STATUS_FLATTEN
+                trading_allowed = trading_status == STATUS_OPEN
+
                 # Check if we should flatten positions (20 min before close)
-                if self.trading_hours.should_flatten_positions(index):
+                if should_flatten:
                     if not self._positions_flattened_today and self.open_trade_count > 0:
                         self.flatten_all_positions("CME daily close approaching")
                         self._positions_flattened_today = True
@@ -729,7 +845,7 @@ class Strategy:
                     return
 
                 # Check if market is closed
-                if not self.trading_hours.is_trading_allowed(index):
+                if not trading_allowed:
                     # Still check for exits on existing trades but don't enter new ones
                     self.check_trade_to_remove()
                     self.save_state()
@@ -746,12 +862,13 @@ class Strategy:
             # Save state after each update
             self.save_state()
 
-    def print_trade_stats(self):
-        # Print Trade Summary
-        logger = logging.getLogger(__name__)
-        logger.info(f"Total Pnl for {self.name}: ${self.total_pnl}")
+    def compute_trade_stats(self) -> Dict[str, float]:
+        """
+        Recompute the trade statistics (win rate, averages, reward to risk, losing streak) from the
+        trade history and store them on the strategy.
 
-        # Trade Statistics
+        :return: the remaining figures print_trade_stats reports (win/lose % and biggest winner/loser)
+        """
         wins = [trade[3] for trade in self.trade_history if trade[1] == 'EXIT' and trade[3] > 0]
         losses = [trade[3] for trade in self.trade_history if trade[1] == 'EXIT' and trade[3] <= 0]
         win_percentage = len(wins) / max(1, (len(wins) + len(losses))) * 100
@@ -776,6 +893,27 @@ class Strategy:
                 else:
                     current_streak = 0
 
+        return {
+            'win_percentage': win_percentage,
+            'lose_percentage': lose_percentage,
+            'biggest_winner': biggest_winner,
+            'biggest_loser': biggest_loser,
+        }
+
+    def print_trade_stats(self):
+        # Print Trade Summary
+        logger = logging.getLogger(__name__)
+        logger.info(f"Total Pnl for {self.name}: ${self.total_pnl}")
+
+        # Trade Statistics
+        stats = self.compute_trade_stats()
+        win_percentage = stats['win_percentage']
+        lose_percentage = stats['lose_percentage']
+        biggest_winner = stats['biggest_winner']
+        biggest_loser = stats['biggest_loser']
+        average_winner = self.avgWinner
+        average_loser = self.avgLoser
+
         logger.info(f"\n{self.name} | Trade Statistics:")
         logger.info(f"Win %: {win_percentage:.2f}%, Lose %: {lose_percentage:.2f}%")
         logger.info(f"Biggest Winner: {biggest_winner:.2f}")
@@ -786,6 +924,26 @@ class Strategy:
         logger.info(f"Total Trade made: {self.total_trade}")
         logger.info(f"Highest consecutive lose: {self.max_losing_streak}")
 
+    def get_trade_history_frame(self) -> pd.DataFrame:
+        """
+        Build a DataFrame of the trade history with a cumulative PnL column.
+
+        The (timestamp, action, price, pnl) tuples are transposed once and each
+        column is materialized as a typed array, so no per-row objects are built.
+
+        :return: DataFrame with timestamp, action, price, pnl and cumulative_pnl columns
+        """
+        count = len(self.trade_history)
+        timestamps, actions, prices, pnls = zip(*self.trade_history) if count else ((), (), (), ())
+        pnls = np.fromiter(pnls, dtype=np.float64, count=count)
+        return pd.DataFrame({
+            'timestamp': pd.DatetimeIndex(timestamps),
+            'action': actions,
+            'price': np.fromiter(prices, dtype=np.float64, count=count),
+            'pnl': pnls,
+            'cumulative_pnl': np.cumsum(pnls),
+        })
+
     def plot_trades(self, instrument_data):
 
         # Plot Price and Trade Entries
@@ -1,11 +1,50 @@
+import os
 from typing import List, Optional
 
 import pandas as pd
 
 import matplotlib.pyplot as plt
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 from strategy.strategy import Strategy
 
+BAR_DTYPES = {"open": "float64", "high": "float64", "low": "float64", "close": "float64"}
+
+
+def load_bars(csv_file: str) -> pd.DataFrame:
+    """
+    Load OHLC bars indexed by timestamp, caching them as Parquet next to the CSV.
+
+    The CSV is only parsed when the cache is missing or older than the CSV; later runs
+    read the binary cache instead.
+    :param csv_file: path to the bar CSV (timestamp in the first column)
+    :return: DataFrame of bars
+    """
+    parquet_file = os.path.splitext(csv_file)[0] + ".parquet"
+
+    if HAS_PYARROW and os.path.exists(parquet_file) and os.path.getmtime(parquet_file) > os.path.getmtime(csv_file):
+        # Reuse the binary cache written by a previous run; only load the price columns
+        return pd.read_parquet(parquet_file, columns=list(BAR_DTYPES))
+    if HAS_PYARROW:
+        # Multithreaded Arrow parser, called directly so the timestamps are parsed straight to ns and
+        # the Arrow buffers are released while the frame is built
+        with open(csv_file) as f:
+            index_col = f.readline().split(",")[0].strip()
+        column_types = {index_col: pa.timestamp("ns"), **{name: pa.float64() for name in BAR_DTYPES}}
+        # Only the columns the cache path returns, so cold and warm loads give the same frame
+        convert_options = pacsv.ConvertOptions(column_types=column_types, include_columns=[index_col, *BAR_DTYPES])
+        table = pacsv.read_csv(csv_file, convert_options=convert_options)
+        data = table.to_pandas(split_blocks=True, self_destruct=True).set_index(index_col)
+        data.to_parquet(parquet_file)
+        return data
+    return pd.read_csv(csv_file, parse_dates=[0], index_col=0, dtype=BAR_DTYPES)
+
 
 class StrategyBacktester:
 
@@ -15,6 +54,8 @@ class StrategyBacktester:
         """
         self.strategies: List[Strategy] = []
         self.data: Optional[pd.DataFrame] = None
+        # CME status per bar for the loaded data, keyed by early close calendar; reused across runs
+        self._status_cache = {}
 
     def load_strategies(self, strategies: List[Strategy]) -> None:
         """
@@ -32,13 +73,40 @@ class StrategyBacktester:
         """
         self.strategies.append(strategy)
 
+    def reset_strategy(self, strategy: Strategy) -> None:
+        """
+        Replace the loaded strategies with a single fresh one, keeping the data and its
+        precomputed trading statuses (e.g. one backtester reused for every optimizer combo)
+
+        :param strategy: A single strategy
+        :return:
+        """
+        self.strategies = [strategy]
+
     def load_backtest_data(self, df: pd.DataFrame) -> None:
         """
 
-        :param df: our backtest data
+        :param df: our backtest data (kept by reference, not copied)
         :return:
         """
         self.data = df
+        self._status_cache = {}
+
+    def _trading_statuses(self, strategy: Strategy) -> Optional[list]:
+        """
+        CME trading status of every bar for this strategy, classified once per calendar
+
+        :param strategy: strategy to classify the bars for
+        :return: list of status codes, or None when the strategy ignores trading hours
+        """
+        if not (strategy.use_trading_hours and strategy.trading_hours):
+            return None
+        # Close times may be JSON lists, so key on tuples (as cme_trading_hours._handler_for does)
+        key = frozenset((day, tuple(close)) for day, close in strategy.trading_hours.early_close_calendar.items())
+        statuses = self._status_cache.get(key)
+        if statuses is None:
+            statuses = self._status_cache[key] = strategy.trading_hours.classify_index(self.data.index).tolist()
+        return statuses
 
     def run_backtest(self) -> None:
 
@@ -47,20 +115,22 @@ class StrategyBacktester:
         :return:
         """
         last_price = None
-        # Backtest Strategy
-        for index, row in self.data.iterrows():
-            price = row['close']  # update current price
-            high_price = row['high']
-            low_price = row['low']
-            
 
+        # Classify every bar against CME trading hours up front instead of per bar
+        trading_statuses = [self._trading_statuses(strategy) for strategy in self.strategies]
+
+        # Backtest Strategy
+        # Walk the price columns as arrays; iterrows() would build a Series for every bar
+        bars = zip(self.data.index, self.data['close'].to_numpy(), self.data['high'].to_numpy(),
+                   self.data['low'].to_numpy())
+        for i, (index, price, high_price, low_price) in enumerate(bars):
             if last_price is None:  # cant trade without a valid last price
                 last_price = price
                 continue
-            for strategy in self.strategies:
+            for strategy, statuses in zip(self.strategies, trading_statuses):
                 # pass the relevant price information
-                
-                strategy.update(index, price, last_price, high_price, low_price)
+                trading_status = statuses[i] if statuses is not None else None
+                strategy.update(index, price, last_price, high_price, low_price, trading_status=trading_status)
 
             # update
             last_price = price  # update previous price
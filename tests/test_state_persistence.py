@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from lib.state_persistence import StatePersistence, _from_epoch_ns, _to_epoch_ns
+
+
+class EpochNsTest(unittest.TestCase):
+
+    def test_round_trip_keeps_nanoseconds(self):
+        ts = pd.Timestamp("2024-03-15 09:30:00.123456789")
+        encoded = _to_epoch_ns(ts)
+        self.assertEqual(encoded, ts.value)
+        self.assertEqual(_from_epoch_ns(encoded), ts)
+
+    def test_round_trip_datetime(self):
+        dt = datetime(2024, 3, 15, 9, 30, 0, 123456)
+        decoded = _from_epoch_ns(_to_epoch_ns(dt))
+        self.assertIsInstance(decoded, datetime)
+        self.assertEqual(decoded, dt)
+
+    def test_strings_pass_through(self):
+        self.assertEqual(_from_epoch_ns("2024-03-15 09:30:00"), "2024-03-15 09:30:00")
+
+
+class ConnectionLifecycleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.persistence = StatePersistence(db_path=os.path.join(self.tmp_dir.name, "state.db"))
+
+    def tearDown(self):
+        self.persistence.close()
+        self.tmp_dir.cleanup()
+
+    def test_close_releases_connections_of_other_threads(self):
+        opened = []
+
+        def open_connection():
+            conn = self.persistence._get_connection()
+            conn.execute("SELECT 1")
+            opened.append(conn)
+
+        workers = [threading.Thread(target=open_connection) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.persistence.close()
+        for conn in opened:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+
+    def test_connection_reopens_after_close(self):
+        self.persistence.set_account_id("ESH6", 123)
+        self.persistence.close()
+        self.assertEqual(self.persistence.get_account_id("ESH6"), 123)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from strategy.strategy import Strategy
+from strategy.strategy_backtester import StrategyBacktester
+
+
+def make_bars():
+    index = pd.date_range("2024-11-27 09:00", periods=3 * 24 * 60, freq="1min")
+    close = 5000 + 20 * np.sin(np.arange(len(index)) / 30)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close}, index=index)
+
+
+def make_strategy(early_close_calendar):
+    strategy = Strategy(name="Test", trader=None, entry_offset=5, take_profit_offset=35, stop_loss_offset=100,
+                        trail_trigger=3, re_entry_distance=1, max_open_trades=10, max_contracts_per_trade=1,
+                        early_close_calendar=early_close_calendar)
+    strategy.load_static_levels([float(level) for level in range(4900, 5100, 5)])
+    return strategy
+
+
+class EarlyCloseCalendarTest(unittest.TestCase):
+
+    def test_json_list_calendar_matches_tuple_calendar(self):
+        # json.load gives lists for the (hour, minute) close times
+        json_calendar = json.loads('{"2024-11-29": [12, 15]}')
+        results = []
+        for calendar in (json_calendar, {"2024-11-29": (12, 15)}):
+            backtester = StrategyBacktester()
+            backtester.load_backtest_data(make_bars())
+            strategy = make_strategy(calendar)
+            backtester.load_strategy(strategy)
+            backtester.run_backtest()
+            results.append((strategy.trade_history, strategy.total_pnl))
+        self.assertTrue(results[0][0])
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
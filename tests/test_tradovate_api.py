@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+import httpx
+
+from lib import token_manager as token_manager_module
+from lib.token_manager import TokenManager
+from lib.tradovate_api import TradovateTrader
+
+
+class FakeTokenManager:
+
+    def __init__(self, token="token"):
+        self.token = token
+
+    def get_token(self):
+        return self.token
+
+
+def make_trader(handler, token_manager=None):
+    trader = TradovateTrader(symbol="ESH6", token_manager=token_manager or FakeTokenManager(),
+                             api_url="https://api.test")
+    trader.client = httpx.Client(base_url="https://api.test", transport=httpx.MockTransport(handler))
+    trader.account_id = 1
+    return trader
+
+
+class NetPositionTest(unittest.TestCase):
+
+    def test_fresh_bypasses_cache(self):
+        net_positions = iter([2, 0])
+        position_requests = []
+
+        def handler(request):
+            position_requests.append(request)
+            return httpx.Response(200, json=[{"netPos": next(net_positions)}])
+
+        trader = make_trader(handler)
+        self.assertEqual(trader.get_net_position(), 2)
+        # Cached: no second request
+        self.assertEqual(trader.get_net_position(), 2)
+        self.assertEqual(len(position_requests), 1)
+        # A broker-side change shows up when the cache is bypassed
+        self.assertEqual(trader.get_net_position(fresh=True), 0)
+        self.assertEqual(len(position_requests), 2)
+
+
+class ExpiredTokenTest(unittest.TestCase):
+
+    def test_request_recovers_when_renew_is_rejected(self):
+        auth_paths = []
+
+        def auth_handler(request):
+            auth_paths.append(request.url.path)
+            if request.url.path == "/auth/renewaccesstoken":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"accessToken": "new-token"})
+
+        def api_handler(request):
+            if request.headers["Authorization"] != "Bearer new-token":
+                return httpx.Response(401)
+            return httpx.Response(200, json=[{"id": 7}])
+
+        token_manager = TokenManager()
+        token_manager.token = "expired-token"
+        auth_client = httpx.Client(transport=httpx.MockTransport(auth_handler))
+        with mock.patch.object(token_manager_module, "_client", auth_client), \
+                mock.patch.object(token_manager_module, "TRADOVATE_API_URL", "https://api.test"):
+            trader = make_trader(api_handler, token_manager=token_manager)
+            trader.account_id = None
+            self.assertEqual(trader.ensure_account_id(), 7)
+
+        self.assertEqual(auth_paths, ["/auth/renewaccesstoken", "/auth/accesstokenrequest"])
+        self.assertEqual(token_manager.get_token(), "new-token")
+
+
+if __name__ == "__main__":
+    unittest.main()